@@ -1,9 +1,160 @@
 #!/usr/bin/python3
 """Blueprint for app_views"""
 
-from flask import Blueprint
+from datetime import timezone
+from flask import Blueprint, Response, abort, request
+from flask import stream_with_context
+import hashlib
+from urllib.parse import urlencode
 
 app_views = Blueprint('app_views', __name__, url_prefix='/api/v1')
+# default number of objects in a page when only a cursor is given
+PAGE_SIZE = 100
+# number of characters buffered before a chunk of a stream is sent
+CHUNK_SIZE = 1 << 16
+
+
+def limit_arg(default=None):
+    """Returns the `limit` query parameter, or default if it is missing
+
+    Raises:
+        a: 400 error if limit is not a positive integer
+    """
+    if 'limit' not in request.args:
+        return default
+    try:
+        limit = int(request.args['limit'])
+    except ValueError:
+        limit = 0
+    if limit < 1:
+        abort(400, "Invalid limit")
+    return limit
+
+
+def paginate(cls, **attrs):
+    """Returns the page of cls objects asked for by the `limit` and `cursor`
+    query parameters, ordered by id
+
+    Args:
+        cls: class of the objects listed
+        attrs: attribute values the objects listed must have
+
+    Raises:
+        a: 400 error if limit is not a positive integer
+
+    Returns:
+        [json string]: the list of objects, with the next cursor in the
+        X-Next-Cursor and Link headers if there are more, or None if the
+        request asks for no page
+    """
+    from models import storage
+    if 'limit' not in request.args and 'cursor' not in request.args:
+        return None
+    limit = limit_arg(PAGE_SIZE)
+    objs = storage.filter(cls, "id", limit + 1, request.args.get('cursor'),
+                          **attrs)
+    body = ",".join(obj.to_json() for obj in objs[:limit])
+    response = Response("[" + body + "]", mimetype='application/json')
+    if len(objs) > limit:
+        args = request.args.to_dict()
+        args['cursor'] = objs[limit - 1].id
+        response.headers['X-Next-Cursor'] = args['cursor']
+        response.headers['Link'] = '<{}?{}>; rel="next"'.format(
+            request.base_url, urlencode(args))
+    return response, 200
+
+
+def conditional(objs, make_response, collection=False):
+    """Returns make_response() with ETag and Last-Modified headers derived
+    from the id and updated_at of objs, or, without calling make_response,
+    an empty 304 Not Modified response if the If-None-Match or
+    If-Modified-Since header of a GET shows the client has them already
+
+    A collection gets no Last-Modified and If-Modified-Since is ignored
+    for it: the newest updated_at of its members does not change when one
+    of them leaves it, while its ETag does.
+
+    Args:
+        objs: the objects the response is made of
+        make_response: function building the full response
+        collection: whether objs is a list members can be removed from
+
+    Returns:
+        [response]: the full or the 304 Not Modified response
+    """
+    digest = hashlib.sha1()
+    modified = None
+    for obj in sorted(objs, key=lambda obj: obj.id):
+        digest.update("{}.{}:{};".format(obj.__class__.__name__, obj.id,
+                                         obj.updated_at).encode())
+        if modified is None or obj.updated_at > modified:
+            modified = obj.updated_at
+    etag = digest.hexdigest()
+    if collection:
+        modified = None
+    elif modified is not None:
+        modified = modified.replace(microsecond=0, tzinfo=timezone.utc)
+    response = None
+    if request.method in ('GET', 'HEAD'):
+        if request.if_none_match:
+            if request.if_none_match.contains(etag):
+                response = Response(status=304)
+        elif request.if_modified_since and modified is not None:
+            if modified <= request.if_modified_since:
+                response = Response(status=304)
+    if response is None:
+        response = make_response()
+    response.set_etag(etag)
+    if modified is not None:
+        response.last_modified = modified
+    return response
+
+
+def serialize(obj):
+    """Returns a JSON response of obj.to_dict(), made conditional on its
+    ETag and Last-Modified
+
+    Args:
+        obj: the object returned
+
+    Returns:
+        [json string]: the object, reusing the JSON text file storage
+        caches for it
+    """
+    return conditional([obj], lambda: Response(obj.to_json(),
+                                               mimetype='application/json'))
+
+
+def stream(objs):
+    """Returns a JSON array of the to_dict() of objs that is sent a chunk
+    at a time, so that the whole list never sits in memory
+
+    Args:
+        objs: iterable of the objects listed, such as storage.iter(cls)
+
+    Returns:
+        [json string]: the streamed list of objects
+    """
+    def generate():
+        """yields the JSON array in chunks of about CHUNK_SIZE"""
+        parts = ["["]
+        separator = ""
+        size = 0
+        for obj in objs:
+            part = obj.to_json()
+            parts.append(separator)
+            parts.append(part)
+            separator = ","
+            size += len(part)
+            if size >= CHUNK_SIZE:
+                yield "".join(parts)
+                parts = []
+                size = 0
+        parts.append("]")
+        yield "".join(parts)
+    return Response(stream_with_context(generate()),
+                    mimetype='application/json')
+
 
 from api.v1.views.index import *
 from api.v1.views.states import *
@@ -12,3 +163,5 @@ from api.v1.views.amenities import *
 from api.v1.views.users import *
 from api.v1.views.places import *
 from api.v1.views.places_reviews import *
+from api.v1.views.batch import *
+from api.v1.views.search import *
@@ -1,7 +1,7 @@
 #!/usr/bin/python3
 """View for Amenity objects that handles all default RESTFul API actions"""
 from flask import abort, jsonify, request
-from api.v1.views import app_views
+from api.v1.views import app_views, paginate, serialize, stream
 from models import storage
 from models.amenity import Amenity
 
@@ -23,13 +23,14 @@ def get_amenity(amenity_id=None):
         if not, retrieves an Amenity object
     """
     if amenity_id is None:
-        list_obj_amenity = storage.all(Amenity).values()
-        dict_obj_amenity = [obj.to_dict() for obj in list_obj_amenity]
-        return jsonify(dict_obj_amenity), 200
+        page = paginate(Amenity)
+        if page is not None:
+            return page
+        return stream(storage.iter(Amenity)), 200
     obj_amenity = storage.get(Amenity, amenity_id)
     if obj_amenity is None:
         abort(404)
-    return jsonify(obj_amenity.to_dict()), 200
+    return serialize(obj_amenity)
 
 
 @app_views.route('/amenities/<amenity_id>', strict_slashes=False,
@@ -73,7 +74,7 @@ def create_amenity():
         abort(400, "Missing name")
     new_amenity = Amenity(**new_amenity_data)
     new_amenity.save()
-    return jsonify(new_amenity.to_dict()), 201
+    return serialize(new_amenity), 201
 
 
 @app_views.route('/amenities/<amenity_id>', strict_slashes=False,
@@ -102,4 +103,4 @@ def update_amenity(amenity_id):
         if key not in ['id', 'created_at', 'updated_at']:
             setattr(obj_amenity, key, value)
     obj_amenity.save()
-    return jsonify(obj_amenity.to_dict()), 200
+    return serialize(obj_amenity), 200
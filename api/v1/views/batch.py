@@ -0,0 +1,82 @@
+#!/usr/bin/python3
+"""View creating objects of several classes in a single request"""
+from flask import abort, request, Response
+from api.v1.views import app_views
+from models import storage
+from models.amenity import Amenity
+from models.city import City
+from models.place import Place
+from models.review import Review
+from models.state import State
+from models.user import User
+
+collections = (("amenities", Amenity, ("name",), {}),
+               ("users", User, ("email", "password"), {}),
+               ("states", State, ("name",), {}),
+               ("cities", City, ("state_id", "name"), {"state_id": State}),
+               ("places", Place, ("city_id", "user_id", "name"),
+                {"city_id": City, "user_id": User}),
+               ("reviews", Review, ("place_id", "user_id", "text"),
+                {"place_id": Place, "user_id": User}))
+
+
+@app_views.route('/batch', strict_slashes=False, methods=['POST'])
+def create_batch():
+    """Creates the objects listed under the names /stats uses for their
+    classes, in one save: parents first, so cities may refer to states
+    created by the same request through the ids given to them
+
+    Raises:
+    a: 400 error if:
+        - The HTTP body request is not a JSON object of lists of objects,
+            or an id or a parent id is not a string.
+            Message "Not a JSON"
+        - A name isn't one of /stats. Message "Unknown <name>"
+        - An object lacks a key its own POST requires.
+            Message "Missing <key>"
+    a: 404 error if a state_id, city_id, user_id or place_id is not linked
+        to any object, stored or in the request
+    a: 409 error if an id given is already stored or given twice.
+        Message "Duplicate id"
+
+    Returns:
+        [json string]: The new objects, by name, with the status code 201
+    """
+    data = request.get_json()
+    if not isinstance(data, dict):
+        abort(400, "Not a JSON")
+    for name in data:
+        if name not in [collection[0] for collection in collections]:
+            abort(400, "Unknown " + name)
+    keys = set()
+    created = []
+    for name, cls, required, parents in collections:
+        items = data.get(name, [])
+        if not isinstance(items, list):
+            abort(400, "Not a JSON")
+        objs = []
+        for item in items:
+            if not isinstance(item, dict):
+                abort(400, "Not a JSON")
+            for key in required:
+                if key not in item:
+                    abort(400, "Missing " + key)
+            for key in ["id"] + list(parents):
+                if key in item and not isinstance(item[key], str):
+                    abort(400, "Not a JSON")
+            for key, parent in parents.items():
+                if parent.__name__ + "." + str(item[key]) not in keys and \
+                        storage.get(parent, item[key]) is None:
+                    abort(404)
+            obj = cls(**item)
+            key = cls.__name__ + "." + str(obj.id)
+            if key in keys or storage.get(cls, obj.id) is not None:
+                abort(409, "Duplicate id")
+            keys.add(key)
+            objs.append(obj)
+        created.append((name, objs))
+    storage.bulk_new([obj for name, objs in created for obj in objs])
+    body = ",".join('"{}":[{}]'.format(
+        name, ",".join(obj.to_json() for obj in objs))
+        for name, objs in created if name in data)
+    return Response("{" + body + "}", mimetype='application/json'), 201
@@ -1,7 +1,8 @@
 #!/usr/bin/python3
 """View for City objects that handles all default RESTFul API actions"""
 from flask import abort, jsonify, request
-from api.v1.views import app_views
+from api.v1.views import app_views, conditional, paginate, serialize
+from api.v1.views import stream
 from models import storage
 from models.city import City
 from models.state import State
@@ -24,9 +25,11 @@ def get_list_cities(state_id):
     obj_state = storage.get(State, state_id)
     if obj_state is None:
         abort(404)
+    page = paginate(City, state_id=state_id)
+    if page is not None:
+        return page
     cities = obj_state.cities
-    list_cities = [city.to_dict() for city in cities]
-    return jsonify(list_cities), 200
+    return conditional(cities, lambda: stream(cities), collection=True)
 
 
 @app_views.route('/cities/<city_id>', strict_slashes=False, methods=['GET'])
@@ -45,7 +48,7 @@ def get_city(city_id):
     obj_city = storage.get(City, city_id)
     if obj_city is None:
         abort(404)
-    return jsonify(obj_city.to_dict()), 200
+    return serialize(obj_city)
 
 
 @app_views.route('/cities/<city_id>', strict_slashes=False, methods=['DELETE'])
@@ -94,7 +97,7 @@ def create_city(state_id):
     new_city_data['state_id'] = state.id
     new_city = City(**new_city_data)
     new_city.save()
-    return jsonify(new_city.to_dict()), 201
+    return serialize(new_city), 201
 
 
 @app_views.route('/cities/<city_id>', strict_slashes=False, methods=['PUT'])
@@ -124,4 +127,4 @@ def update_city(city_id):
         if key not in ['id', 'state_id', 'created_at', 'updated_at']:
             setattr(obj_city, key, value)
     obj_city.save()
-    return jsonify(obj_city.to_dict()), 200
+    return serialize(obj_city), 200
@@ -1,7 +1,7 @@
 #!/usr/bin/python3
 """Return status code"""
 from api.v1.views import app_views
-from flask import jsonify
+from flask import abort, jsonify
 from models import storage
 from models.amenity import Amenity
 from models.city import City
@@ -31,3 +31,14 @@ def stats():
         "users": storage.count(User)
         }
     return jsonify(num_objs_by_class), 200
+
+
+@app_views.route('/stats/pool', strict_slashes=False)
+def pool_stats():
+    """Returns the storage connection pool statistics: size, checked in
+    and out connections, overflow, and checkout count and wait times
+    """
+    pool = storage.pool_stats()
+    if pool is None:
+        abort(404)
+    return jsonify(pool), 200
@@ -1,8 +1,11 @@
 #!/usr/bin/python3
 """View for Place objects that handles all default RESTFul API actions"""
 from flask import abort, jsonify, request
-from api.v1.views import app_views
+from api.v1.views import app_views, conditional, paginate, serialize
+from api.v1.views import limit_arg, stream
+import math
 from models import storage
+from models.engine.columns import EARTH_RADIUS
 from models.city import City
 from models.place import Place
 from models.user import User
@@ -25,9 +28,11 @@ def get_list_places(city_id):
     obj_city = storage.get(City, city_id)
     if obj_city is None:
         abort(404)
+    page = paginate(Place, city_id=city_id)
+    if page is not None:
+        return page
     places = obj_city.places
-    list_places = [place.to_dict() for place in places]
-    return jsonify(list_places), 200
+    return conditional(places, lambda: stream(places), collection=True)
 
 
 @app_views.route('/places/<place_id>', strict_slashes=False, methods=['GET'])
@@ -46,7 +51,7 @@ def get_place(place_id):
     obj_place = storage.get(Place, place_id)
     if obj_place is None:
         abort(404)
-    return jsonify(obj_place.to_dict()), 200
+    return serialize(obj_place)
 
 
 @app_views.route('/places/<place_id>', strict_slashes=False,
@@ -106,7 +111,7 @@ def create_place(city_id):
     new_place_data['city_id'] = city.id
     new_place = Place(**new_place_data)
     new_place.save()
-    return jsonify(new_place.to_dict()), 201
+    return serialize(new_place), 201
 
 
 @app_views.route('/places/<place_id>', strict_slashes=False, methods=['PUT'])
@@ -136,4 +141,106 @@ def update_place(place_id):
         if key not in ['id', 'user_id', 'city_id', 'created_at', 'updated_at']:
             setattr(obj_place, key, value)
     obj_place.save()
-    return jsonify(obj_place.to_dict()), 200
+    return serialize(obj_place), 200
+
+
+@app_views.route('/places_search', strict_slashes=False, methods=['POST'])
+def places_search():
+    """Retrieves the Place objects in the states and cities listed in the
+    body, and with every amenity listed in it: all places when the lists
+    are empty or missing
+
+    The places of each state, city and amenity are posting lists of ids
+    from the storage indexes, joined by set union and intersection, the
+    smallest first.
+
+    Raises:
+    a: 400 error if the HTTP body request is not a JSON object of lists
+        of ids. Message "Not a JSON"
+
+    Returns:
+        [json string]: The list of the matching Place objects, sorted by id
+    """
+    search = request.get_json()
+    if not isinstance(search, dict):
+        abort(400, "Not a JSON")
+    lists = [search.get(name) or []
+             for name in ("states", "cities", "amenities")]
+    if not all(isinstance(ids, list) and
+               all(isinstance(id, str) for id in ids) for ids in lists):
+        abort(400, "Not a JSON")
+    states, cities, amenities = lists
+    postings = []
+    if states or cities:
+        city_ids = set(cities) | storage.ids(City, "state_id", states)
+        postings.append(storage.ids(Place, "city_id", city_ids))
+    for amenity_id in set(amenities):
+        postings.append(storage.ids(Place, "amenity_ids", [amenity_id]))
+    if not postings:
+        return stream(storage.iter(Place)), 200
+    postings.sort(key=len)
+    place_ids = postings[0].intersection(*postings[1:])
+    return stream(storage.get(Place, place_id)
+                  for place_id in sorted(place_ids)), 200
+
+
+def coordinate(name, low, high, required=True):
+    """Returns the query parameter name as a float between low and high,
+    or None if it is missing and not required
+
+    Raises:
+        a: 400 error if it is required and missing, not a number, or out of
+        bounds. Message "Invalid <name>"
+    """
+    value = request.args.get(name)
+    if value is None and not required:
+        return None
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        abort(400, "Invalid " + name)
+    if not low <= value <= high:
+        abort(400, "Invalid " + name)
+    return value
+
+
+@app_views.route('/places_near', strict_slashes=False, methods=['GET'])
+def places_near():
+    """Retrieves the Place objects located within `radius` kilometers of
+    the point at `latitude` and `longitude`, nearest first, at most `limit`
+    of them if given
+
+    Raises:
+        a: 400 error if a parameter is missing or invalid
+
+    Returns:
+        [json string]: The list of the Place objects found
+    """
+    latitude = coordinate('latitude', -90, 90)
+    longitude = coordinate('longitude', -180, 180)
+    radius = coordinate('radius', 0, math.pi * EARTH_RADIUS)
+    return stream(storage.near(Place, latitude, longitude, radius,
+                               limit_arg())), 200
+
+
+@app_views.route('/places_within', strict_slashes=False, methods=['GET'])
+def places_within():
+    """Retrieves the Place objects located within the box bounded by
+    `south`, `west`, `north` and `east`, crossing the antimeridian when
+    west > east, nearest to `latitude` and `longitude` first (the center of
+    the box if they are not given), at most `limit` of them if given
+
+    Raises:
+        a: 400 error if a parameter is missing or invalid
+
+    Returns:
+        [json string]: The list of the Place objects found
+    """
+    south = coordinate('south', -90, 90)
+    north = coordinate('north', south, 90)
+    west = coordinate('west', -180, 180)
+    east = coordinate('east', -180, 180)
+    latitude = coordinate('latitude', -90, 90, False)
+    longitude = coordinate('longitude', -180, 180, False)
+    return stream(storage.within(Place, south, west, north, east, latitude,
+                                 longitude, limit_arg())), 200
@@ -1,7 +1,8 @@
 #!/usr/bin/python3
 """View for Review objects that handles all default RESTFul API actions"""
 from flask import abort, jsonify, request
-from api.v1.views import app_views
+from api.v1.views import app_views, conditional, paginate, serialize
+from api.v1.views import stream
 from models import storage
 from models.place import Place
 from models.review import Review
@@ -25,9 +26,11 @@ def get_list_reviews(place_id):
     obj_place = storage.get(Place, place_id)
     if obj_place is None:
         abort(404)
+    page = paginate(Review, place_id=place_id)
+    if page is not None:
+        return page
     reviews = obj_place.reviews
-    list_reviews = [review.to_dict() for review in reviews]
-    return jsonify(list_reviews), 200
+    return conditional(reviews, lambda: stream(reviews), collection=True)
 
 
 @app_views.route('/reviews/<review_id>', strict_slashes=False, methods=['GET'])
@@ -46,7 +49,7 @@ def get_review(review_id):
     obj_review = storage.get(Review, review_id)
     if obj_review is None:
         abort(404)
-    return jsonify(obj_review.to_dict()), 200
+    return serialize(obj_review)
 
 
 @app_views.route('/reviews/<review_id>', strict_slashes=False,
@@ -106,7 +109,7 @@ def create_review(place_id):
     new_review_data['place_id'] = place.id
     new_review = Review(**new_review_data)
     new_review.save()
-    return jsonify(new_review.to_dict()), 201
+    return serialize(new_review), 201
 
 
 @app_views.route('/reviews/<review_id>', strict_slashes=False, methods=['PUT'])
@@ -137,4 +140,4 @@ def update_review(review_id):
                        'updated_at']:
             setattr(obj_review, key, value)
     obj_review.save()
-    return jsonify(obj_review.to_dict()), 200
+    return serialize(obj_review), 200
@@ -0,0 +1,52 @@
+#!/usr/bin/python3
+"""View searching the words of Place descriptions and Review texts"""
+from flask import abort, request, Response
+from api.v1.views import app_views, limit_arg, PAGE_SIZE
+from models import storage
+from models.place import Place
+from models.review import Review
+from urllib.parse import urlencode
+
+searched = {"places": Place, "reviews": Review}
+
+
+@app_views.route('/search', strict_slashes=False, methods=['GET'])
+def text_search():
+    """Retrieves the Place (or, with `type` reviews, Review) objects whose
+    description (or text) holds one of the words of `q`, best BM25 match
+    first, a page of `limit` of them starting at the rank `cursor`
+
+    Raises:
+    a: 400 error if:
+        - q is missing. Message "Missing q"
+        - type is not places or reviews. Message "Invalid type"
+        - limit is not a positive integer. Message "Invalid limit"
+        - cursor is not a rank. Message "Invalid cursor"
+
+    Returns:
+        [json string]: The list of the objects found, with the next cursor
+        in the X-Next-Cursor and Link headers if there are more
+    """
+    query = request.args.get('q')
+    if query is None:
+        abort(400, "Missing q")
+    cls = searched.get(request.args.get('type', "places"))
+    if cls is None:
+        abort(400, "Invalid type")
+    limit = limit_arg(PAGE_SIZE)
+    try:
+        offset = int(request.args.get('cursor', 0))
+    except ValueError:
+        offset = -1
+    if offset < 0:
+        abort(400, "Invalid cursor")
+    objs = storage.text_search(cls, query, limit + 1, offset)
+    body = ",".join(obj.to_json() for obj in objs[:limit])
+    response = Response("[" + body + "]", mimetype='application/json')
+    if len(objs) > limit:
+        args = request.args.to_dict()
+        args['cursor'] = str(offset + limit)
+        response.headers['X-Next-Cursor'] = args['cursor']
+        response.headers['Link'] = '<{}?{}>; rel="next"'.format(
+            request.base_url, urlencode(args))
+    return response, 200
@@ -1,7 +1,7 @@
 #!/usr/bin/python3
 """View for State objects that handles all default RESTFul API actions"""
 from flask import abort, jsonify, request
-from api.v1.views import app_views
+from api.v1.views import app_views, paginate, serialize, stream
 import models
 from models.state import State
 
@@ -24,13 +24,14 @@ def states(state_id=None):
     retrieves a State object
     """
     if state_id is None:
-        list_obj_state = models.storage.all(State).values()
-        dict_obj_state = [obj.to_dict() for obj in list_obj_state]
-        return jsonify(dict_obj_state), 200
+        page = paginate(State)
+        if page is not None:
+            return page
+        return stream(models.storage.iter(State)), 200
     obj_state = models.storage.get(State, state_id)
     if obj_state is None:
         abort(404)
-    return jsonify(obj_state.to_dict()), 200
+    return serialize(obj_state)
 
 
 @app_views.route('/states/<state_id>', strict_slashes=False,
@@ -74,7 +75,7 @@ def create_state():
         abort(400, "Missing name")
     new_state = State(**new_state_data)
     new_state.save()
-    return jsonify(new_state.to_dict()), 201
+    return serialize(new_state), 201
 
 
 @app_views.route('/states/<state_id>', strict_slashes=False, methods=['PUT'])
@@ -104,4 +105,4 @@ def update_state(state_id):
         if key not in ['id', 'created_at', 'updated_at']:
             setattr(obj_state, key, value)
     obj_state.save()
-    return jsonify(obj_state.to_dict()), 200
+    return serialize(obj_state), 200
@@ -1,7 +1,7 @@
 #!/usr/bin/python3
 """View for User objects that handles all default RESTFul API actions"""
 from flask import abort, jsonify, request
-from api.v1.views import app_views
+from api.v1.views import app_views, paginate, serialize, stream
 from models import storage
 from models.user import User
 
@@ -23,13 +23,14 @@ def get_user(user_id=None):
         if not then retrieves a User object
     """
     if user_id is None:
-        list_obj_user = storage.all(User).values()
-        dict_obj_user = [obj.to_dict() for obj in list_obj_user]
-        return jsonify(dict_obj_user), 200
+        page = paginate(User)
+        if page is not None:
+            return page
+        return stream(storage.iter(User)), 200
     obj_user = storage.get(User, user_id)
     if obj_user is None:
         abort(404)
-    return jsonify(obj_user.to_dict()), 200
+    return serialize(obj_user)
 
 
 @app_views.route('/users/<user_id>', strict_slashes=False,
@@ -78,7 +79,7 @@ def create_user():
         abort(400, "Missing password")
     new_user = User(**new_user_data)
     new_user.save()
-    return jsonify(new_user.to_dict()), 201
+    return serialize(new_user), 201
 
 
 @app_views.route('/users/<user_id>', strict_slashes=False,
@@ -107,4 +108,4 @@ def update_user(user_id):
         if key not in ['id', 'email', 'created_at', 'updated_at']:
             setattr(obj_user, key, value)
     obj_user.save()
-    return jsonify(obj_user.to_dict()), 200
+    return serialize(obj_user), 200
@@ -4,6 +4,7 @@ Contains class BaseModel
 """
 
 from datetime import datetime
+from functools import lru_cache
 import models
 from os import getenv
 import sqlalchemy
@@ -13,14 +14,87 @@ import uuid
 
 time = "%Y-%m-%dT%H:%M:%S.%f"
 
+
+@lru_cache(maxsize=1024)
+def parse_time(string):
+    """returns the datetime written in the `time` format by format_time"""
+    if len(string) == 26:
+        return datetime.fromisoformat(string)
+    return datetime.strptime(string, time)
+
+
+def format_time(value):
+    """returns value written in the `time` format"""
+    return value.isoformat(timespec="microseconds")
+
+
 if models.storage_t == "db":
     Base = declarative_base()
 else:
     Base = object
 
+compact = models.storage_t != "db" and \
+    getenv("HBNB_COMPACT_MODELS", "") not in ("", "0")
+
+
+class Compact(type):
+    """metaclass keeping the attributes of models in __slots__, the class
+    attributes of a model becoming the defaults of its slots"""
+
+    def __new__(mcs, name, bases, namespace):
+        """creates a model class with a slot for each of its attributes"""
+        fields = [field for base in bases
+                  for field in getattr(base, "_fields", ())]
+        defaults = {}
+        for base in bases:
+            defaults.update(getattr(base, "_defaults", {}))
+        slots = list(namespace.pop("__slots__", ()))
+        for attr, value in list(namespace.items()):
+            if not attr.startswith("_") and not callable(value) and \
+                    not isinstance(value, property):
+                defaults[attr] = namespace.pop(attr)
+                slots.append(attr)
+        namespace["__slots__"] = tuple(slots)
+        namespace["_fields"] = tuple(fields + [slot for slot in slots
+                                               if not slot.startswith("__")])
+        namespace["_defaults"] = defaults
+        return super().__new__(mcs, name, bases, namespace)
 
-class BaseModel:
+
+class BaseModel(metaclass=Compact if compact else type):
     """The BaseModel class from which future classes will be derived"""
+    if compact:
+        __slots__ = ("id", "created_at", "updated_at", "__extra")
+
+        def __getattr__(self, name):
+            """returns an attribute set outside the slots, or the default
+            of an unset slot"""
+            try:
+                extra = object.__getattribute__(self, "_BaseModel__extra")
+                return extra[name]
+            except (AttributeError, KeyError):
+                pass
+            if name in self._defaults:
+                return self._defaults[name]
+            raise AttributeError("'{}' object has no attribute '{}'".format(
+                self.__class__.__name__, name))
+
+        @property
+        def __dict__(self):
+            """the attributes set on the instance, in a new dictionary"""
+            attrs = {}
+            for name in self._fields:
+                try:
+                    attrs[name] = object.__getattribute__(self, name)
+                except AttributeError:
+                    pass
+            try:
+                extra = object.__getattribute__(self, "_BaseModel__extra")
+                attrs.update(extra)
+            except AttributeError:
+                pass
+            return attrs
+
     if models.storage_t == "db":
         id = Column(String(60), primary_key=True)
         created_at = Column(DateTime, default=datetime.utcnow)
@@ -33,11 +107,11 @@ class BaseModel:
                 if key != "__class__":
                     setattr(self, key, value)
             if kwargs.get("created_at", None) and type(self.created_at) is str:
-                self.created_at = datetime.strptime(kwargs["created_at"], time)
+                self.created_at = parse_time(kwargs["created_at"])
             else:
                 self.created_at = datetime.utcnow()
             if kwargs.get("updated_at", None) and type(self.updated_at) is str:
-                self.updated_at = datetime.strptime(kwargs["updated_at"], time)
+                self.updated_at = parse_time(kwargs["updated_at"])
             else:
                 self.updated_at = datetime.utcnow()
             if kwargs.get("id", None) is None:
@@ -47,6 +121,20 @@ class BaseModel:
             self.created_at = datetime.utcnow()
             self.updated_at = self.created_at
 
+    if models.storage_t != "db":
+        def __setattr__(self, name, value):
+            """sets an attribute and lets storage refresh its indexes"""
+            if not compact or hasattr(type(self), name):
+                super().__setattr__(name, value)
+            else:
+                try:
+                    extra = object.__getattribute__(self, "_BaseModel__extra")
+                except AttributeError:
+                    extra = {}
+                    super().__setattr__("_BaseModel__extra", extra)
+                extra[name] = value
+            models.storage.changed(self, name)
+
     def __str__(self):
         """String representation of the BaseModel class"""
         return "[{:s}] ({:s}) {}".format(self.__class__.__name__, self.id,
@@ -62,14 +150,19 @@ class BaseModel:
         """returns a dictionary containing all keys/values of the instance"""
         new_dict = self.__dict__.copy()
         if "created_at" in new_dict:
-            new_dict["created_at"] = new_dict["created_at"].strftime(time)
+            new_dict["created_at"] = format_time(new_dict["created_at"])
         if "updated_at" in new_dict:
-            new_dict["updated_at"] = new_dict["updated_at"].strftime(time)
+            new_dict["updated_at"] = format_time(new_dict["updated_at"])
         new_dict["__class__"] = self.__class__.__name__
         if "_sa_instance_state" in new_dict:
             del new_dict["_sa_instance_state"]
         return new_dict
 
+    def to_json(self):
+        """returns the JSON text of to_dict(), which file storage caches
+        until the instance changes"""
+        return models.storage.to_json(self)
+
     def delete(self):
         """delete the current instance from the storage"""
         models.storage.delete(self)
@@ -0,0 +1,315 @@
+#!/usr/bin/python3
+"""
+Contains the Columns class
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+import heapq
+import math
+
+# float - mean radius of the Earth, in kilometers
+EARTH_RADIUS = 6371.0088
+
+
+def distance(latitude, longitude, other_latitude, other_longitude):
+    """returns the great-circle distance, in kilometers, between two points
+    given in degrees"""
+    lat1, lat2 = math.radians(latitude), math.radians(other_latitude)
+    half_dlat = (lat2 - lat1) / 2
+    half_dlng = math.radians(other_longitude - longitude) / 2
+    a = math.sin(half_dlat) ** 2 + \
+        math.cos(lat1) * math.cos(lat2) * math.sin(half_dlng) ** 2
+    return 2 * EARTH_RADIUS * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounds(latitude, longitude, radius):
+    """returns the (south, west, north, east) box, in degrees, holding the
+    points within radius kilometers of a point; west > east when it
+    crosses the antimeridian"""
+    angle = radius / EARTH_RADIUS
+    south = latitude - math.degrees(angle)
+    north = latitude + math.degrees(angle)
+    if south <= -90 or north >= 90 or \
+            math.sin(angle) >= math.cos(math.radians(latitude)):
+        return max(south, -90.0), -180.0, min(north, 90.0), 180.0
+    spread = math.degrees(math.asin(math.sin(angle) /
+                                    math.cos(math.radians(latitude))))
+    west = (longitude - spread + 180) % 360 - 180
+    east = (longitude + spread + 180) % 360 - 180
+    return south, west, north, east
+
+
+def center(south, west, north, east):
+    """returns the (latitude, longitude) of the center of a box"""
+    longitude = (west + east + (360 if west > east else 0)) / 2
+    return (south + north) / 2, (longitude + 180) % 360 - 180
+
+
+def inside(latitude, longitude, south, west, north, east):
+    """returns whether a point lies within a (south, west, north, east) box,
+    which crosses the antimeridian when west > east"""
+    if not south <= latitude <= north:
+        return False
+    if west <= east:
+        return west <= longitude <= east
+    return longitude >= west or longitude <= east
+
+
+def number(value):
+    """returns value as a float, or NaN if it is not a number"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return math.nan
+
+
+class Columns:
+    """numeric attributes of the objects of one class, stored a column of
+    doubles per attribute, each column also kept sorted along with its row
+    numbers so that ranges are found by bisection
+
+    NaN, standing for values that are not numbers, is left out of the
+    sorted columns: such rows never fall within a range.
+
+    Given the latitude and longitude fields as grid, rows are also filed
+    in the cells of a grid of cell_size degrees for geographic queries.
+    """
+
+    # float - side of the grid cells, in degrees
+    cell_size = 1.0
+
+    def __init__(self, fields, items=(), grid=None):
+        """Instantiate the columns of fields, loaded with items: pairs of a
+        key and of the values of the fields for that key, with a grid over
+        the pair of fields grid if given"""
+        self.__fields = tuple(fields)
+        self.__grid = grid
+        self.__cells = {}
+        self.__keys = []
+        self.__rows = {}
+        self.__free = []
+        self.__values = {field: array("d") for field in self.__fields}
+        for key, values in items:
+            self.__rows[key] = len(self.__keys)
+            self.__keys.append(key)
+            for field, value in zip(self.__fields, values):
+                self.__values[field].append(number(value))
+        self.__sorted = {}
+        for field in self.__fields:
+            column = self.__values[field]
+            rows = sorted((row for row in range(len(column))
+                           if not math.isnan(column[row])),
+                          key=column.__getitem__)
+            self.__sorted[field] = (array("d", (column[row] for row in rows)),
+                                    array("q", rows))
+        if grid is not None:
+            for row in range(len(self.__keys)):
+                self.__file(row, self.__cell(row))
+
+    def __len__(self):
+        """returns the number of keys stored"""
+        return len(self.__rows)
+
+    def set(self, key, values):
+        """stores the values of the fields for key, replacing those it had"""
+        row = self.__rows.get(key)
+        if row is None:
+            if self.__free:
+                row = self.__free.pop()
+                self.__keys[row] = key
+            else:
+                row = len(self.__keys)
+                self.__keys.append(key)
+                for column in self.__values.values():
+                    column.append(math.nan)
+            self.__rows[key] = row
+        cell = self.__cell(row)
+        for field, value in zip(self.__fields, values):
+            value = number(value)
+            old = self.__values[field][row]
+            if value == old or math.isnan(value) and math.isnan(old):
+                continue
+            self.__unsort(field, row, old)
+            self.__values[field][row] = value
+            if not math.isnan(value):
+                column, rows = self.__sorted[field]
+                position = bisect_right(column, value)
+                column.insert(position, value)
+                rows.insert(position, row)
+        if self.__cell(row) != cell:
+            self.__unfile(row, cell)
+            self.__file(row, self.__cell(row))
+
+    def discard(self, key):
+        """removes key and its values if they are stored"""
+        row = self.__rows.pop(key, None)
+        if row is None:
+            return
+        self.__unfile(row, self.__cell(row))
+        for field in self.__fields:
+            self.__unsort(field, row, self.__values[field][row])
+            self.__values[field][row] = math.nan
+        self.__keys[row] = None
+        self.__free.append(row)
+
+    def __unsort(self, field, row, value):
+        """removes row, which holds value, from the sorted column of field"""
+        if math.isnan(value):
+            return
+        values, rows = self.__sorted[field]
+        position = bisect_left(values, value)
+        while rows[position] != row:
+            position += 1
+        del values[position]
+        del rows[position]
+
+    def __cell(self, row):
+        """returns the grid cell of row, or None if it has no location"""
+        if self.__grid is None:
+            return None
+        latitude, longitude = (self.__values[field][row]
+                               for field in self.__grid)
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            return None
+        return (int((latitude + 90) // self.cell_size),
+                int((longitude + 180) // self.cell_size) % self.__width())
+
+    def __width(self):
+        """returns the number of grid cells around a parallel"""
+        return math.ceil(360 / self.cell_size)
+
+    def __file(self, row, cell):
+        """files row in a grid cell"""
+        if cell is not None:
+            self.__cells.setdefault(cell, set()).add(row)
+
+    def __unfile(self, row, cell):
+        """removes row from a grid cell"""
+        if cell is not None:
+            rows = self.__cells[cell]
+            rows.discard(row)
+            if not rows:
+                del self.__cells[cell]
+
+    def __located(self, south, west, north, east):
+        """returns the (latitude, longitude, row) of the rows located within
+        a box, reading only the grid cells it overlaps"""
+        size, width = self.cell_size, self.__width()
+        first = int((max(south, -90) + 90) // size)
+        last = int((min(north, 90) + 90) // size)
+        start = int((west + 180) // size)
+        span = int((east + 180) // size) - start + 1
+        if west > east:
+            span += width
+        columns = {(start + j) % width for j in range(min(span, width))}
+        if (last - first + 1) * len(columns) < len(self.__cells):
+            cells = ((i, j) for i in range(first, last + 1) for j in columns)
+        else:
+            cells = (cell for cell in self.__cells
+                     if first <= cell[0] <= last and cell[1] in columns)
+        latitudes, longitudes = (self.__values[field]
+                                 for field in self.__grid)
+        found = []
+        for cell in cells:
+            for row in self.__cells.get(cell, ()):
+                latitude, longitude = latitudes[row], longitudes[row]
+                if inside(latitude, longitude, south, west, north, east):
+                    found.append((latitude, longitude, row))
+        return found
+
+    def near(self, latitude, longitude, radius, limit=None):
+        """returns the keys located within radius kilometers of a point,
+        nearest first, and at most limit of them"""
+        found = []
+        for lat, lng, row in self.__located(*bounds(latitude, longitude,
+                                                    radius)):
+            gap = distance(latitude, longitude, lat, lng)
+            if gap <= radius:
+                found.append((gap, row))
+        if limit is None:
+            found.sort()
+        else:
+            found = heapq.nsmallest(limit, found)
+        return [self.__keys[row] for gap, row in found]
+
+    def within(self, south, west, north, east, latitude=None,
+               longitude=None, limit=None):
+        """returns the keys located within a (south, west, north, east) box,
+        in degrees, crossing the antimeridian when west > east, nearest to
+        a point first (the center of the box by default), and at most limit
+        of them"""
+        if latitude is None or longitude is None:
+            latitude, longitude = center(south, west, north, east)
+        found = [(distance(latitude, longitude, lat, lng), row)
+                 for lat, lng, row in self.__located(south, west, north,
+                                                     east)]
+        if limit is None:
+            found.sort()
+        else:
+            found = heapq.nsmallest(limit, found)
+        return [self.__keys[row] for gap, row in found]
+
+    def __span(self, field, low, high):
+        """returns the slice of the sorted column of field holding the
+        values from low to high, None leaving a bound open"""
+        values = self.__sorted[field][0]
+        start = 0 if low is None else bisect_left(values, low)
+        end = len(values) if high is None else bisect_right(values, high)
+        return slice(start, max(start, end))
+
+    def select(self, ranges, order_by=None, limit=None):
+        """returns the keys whose values lie within ranges, a dictionary of
+        fields to (low, high) inclusive bounds, sorted on the field order_by
+        (descending if it starts with "-") and at most limit of them
+
+        The rows are taken from the sorted column whose range holds the
+        fewest values, then checked against the other ranges column by
+        column. When that column is the one sorted on, they come out in
+        order and the walk stops after limit matches.
+        """
+        descending = order_by is not None and order_by.startswith("-")
+        order = order_by.lstrip("-") if order_by is not None else None
+        bounds = dict(ranges)
+        if order is not None and order not in bounds:
+            bounds[order] = (None, None)
+        spans = {field: self.__span(field, *bounds[field])
+                 for field in bounds}
+        checks = []
+        if spans:
+            driver = min(spans, key=lambda field: (
+                spans[field].stop - spans[field].start, field != order))
+            rows = self.__sorted[driver][1][spans[driver]]
+            for field, (low, high) in bounds.items():
+                if field != driver:
+                    low = -math.inf if low is None else low
+                    high = math.inf if high is None else high
+                    checks.append((self.__values[field], low, high))
+        else:
+            driver = None
+            rows = [row for row, key in enumerate(self.__keys)
+                    if key is not None]
+        if driver is not None and driver == order:
+            if descending:
+                rows = reversed(rows)
+            found = []
+            for row in rows:
+                if all(low <= column[row] <= high
+                       for column, low, high in checks):
+                    found.append(row)
+                    if limit is not None and len(found) == limit:
+                        break
+            return [self.__keys[row] for row in found]
+        for column, low, high in checks:
+            rows = [row for row in rows if low <= column[row] <= high]
+        if order is not None:
+            column = self.__values[order]
+            if limit is None:
+                rows = sorted(rows, key=column.__getitem__,
+                              reverse=descending)
+            elif descending:
+                rows = heapq.nlargest(limit, rows, key=column.__getitem__)
+            else:
+                rows = heapq.nsmallest(limit, rows, key=column.__getitem__)
+        elif limit is not None:
+            rows = rows[:limit]
+        return [self.__keys[row] for row in rows]
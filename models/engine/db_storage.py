@@ -3,21 +3,103 @@
 Contains the class DBStorage
 """
 
+from datetime import datetime
+import json
 import models
 from models.amenity import Amenity
 from models.base_model import BaseModel, Base
 from models.city import City
+from models.engine.columns import bounds, center, distance
+from models.engine.text_index import TextIndex, tokenize
 from models.place import Place
 from models.review import Review
 from models.state import State
 from models.user import User
 from os import getenv
 import sqlalchemy
-from sqlalchemy import create_engine
-from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy import create_engine, event, func, or_
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool, StaticPool
+import threading
+import time
+from sqlalchemy.orm import joinedload, scoped_session, selectinload
+from sqlalchemy.orm import sessionmaker
 
 classes = {"Amenity": Amenity, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
+loaders = {"selectin": selectinload, "joined": joinedload}
+text_attrs = {"Place": "description", "Review": "text"}
+
+
+def flag(value):
+    """returns the boolean an environment variable value stands for"""
+    return value.lower() in ("1", "true", "yes", "on")
+
+
+pool_options = {"HBNB_MYSQL_POOL_SIZE": ("pool_size", int),
+                "HBNB_MYSQL_MAX_OVERFLOW": ("max_overflow", int),
+                "HBNB_MYSQL_POOL_TIMEOUT": ("pool_timeout", float),
+                "HBNB_MYSQL_POOL_RECYCLE": ("pool_recycle", int),
+                "HBNB_MYSQL_POOL_PRE_PING": ("pool_pre_ping", flag),
+                "HBNB_MYSQL_ISOLATION_LEVEL": ("isolation_level", str)}
+
+
+def engine_options():
+    """returns the create_engine() keyword arguments set by the environment
+    variables in pool_options, leaving the unset ones to their defaults"""
+    options = {}
+    for name, (option, kind) in pool_options.items():
+        value = getenv(name)
+        if value:
+            options[option] = kind(value)
+    return options
+
+
+sqlite_pragmas = ("journal_mode=WAL", "synchronous=NORMAL",
+                  "foreign_keys=ON", "busy_timeout=5000",
+                  "cache_size=-65536", "temp_store=MEMORY")
+
+
+def tune_sqlite(dbapi_connection, connection_record):
+    """runs the sqlite_pragmas on a new SQLite connection"""
+    cursor = dbapi_connection.cursor()
+    for pragma in sqlite_pragmas:
+        cursor.execute("PRAGMA " + pragma)
+    cursor.close()
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool keeping track of how long checkouts wait for a connection"""
+
+    def __init__(self, *args, **kwargs):
+        """Instantiate a TimedQueuePool with the arguments of QueuePool"""
+        super().__init__(*args, **kwargs)
+        self.__stats = threading.Lock()
+        self.__checkouts = 0
+        self.__wait = 0.0
+        self.__max_wait = 0.0
+
+    def _do_get(self):
+        """checks a connection out, timing how long it takes"""
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            wait = time.perf_counter() - start
+            with self.__stats:
+                self.__checkouts += 1
+                self.__wait += wait
+                self.__max_wait = max(self.__max_wait, wait)
+
+    def stats(self):
+        """returns a dictionary of the pool occupancy and checkout waits,
+        in seconds"""
+        with self.__stats:
+            return {"size": self.size(), "checked_in": self.checkedin(),
+                    "checked_out": self.checkedout(),
+                    "overflow": self.overflow(),
+                    "checkouts": self.__checkouts,
+                    "wait_time": self.__wait, "max_wait": self.__max_wait}
 
 
 class DBStorage:
@@ -32,11 +114,20 @@ class DBStorage:
         HBNB_MYSQL_HOST = getenv('HBNB_MYSQL_HOST')
         HBNB_MYSQL_DB = getenv('HBNB_MYSQL_DB')
         HBNB_ENV = getenv('HBNB_ENV')
-        self.__engine = create_engine('mysql+mysqldb://{}:{}@{}/{}'.
-                                      format(HBNB_MYSQL_USER,
-                                             HBNB_MYSQL_PWD,
-                                             HBNB_MYSQL_HOST,
-                                             HBNB_MYSQL_DB))
+        url = make_url(getenv('HBNB_DB_URL') or
+                       'mysql+mysqldb://{}:{}@{}/{}'.format(HBNB_MYSQL_USER,
+                                                            HBNB_MYSQL_PWD,
+                                                            HBNB_MYSQL_HOST,
+                                                            HBNB_MYSQL_DB))
+        options = dict(engine_options(), poolclass=TimedQueuePool)
+        if url.get_backend_name() == "sqlite":
+            options["connect_args"] = {"check_same_thread": False}
+            if url.database in (None, "", ":memory:"):
+                options = {"connect_args": options["connect_args"],
+                           "poolclass": StaticPool}
+        self.__engine = create_engine(url, **options)
+        if url.get_backend_name() == "sqlite":
+            event.listen(self.__engine, "connect", tune_sqlite)
         if HBNB_ENV == "test":
             Base.metadata.drop_all(self.__engine)
 
@@ -45,8 +136,7 @@ class DBStorage:
         new_dict = {}
         for clss in classes:
             if cls is None or cls is classes[clss] or cls is clss:
-                objs = self.__session.query(classes[clss]).all()
-                for obj in objs:
+                for obj in self.__query(classes[clss], {}):
                     key = obj.__class__.__name__ + '.' + obj.id
                     new_dict[key] = obj
         return (new_dict)
@@ -59,11 +149,47 @@ class DBStorage:
         """commit all changes of the current database session"""
         self.__session.commit()
 
+    def bulk_new(self, objs):
+        """inserts all of objs, with one executemany per run of objects of
+        the same class, and commits them. Relationship collections set on
+        objs are not saved"""
+        self.__session.bulk_save_objects(objs)
+        self.__session.commit()
+
+    def bulk_update(self, cls, rows):
+        """sets the attributes in each dictionary of rows, except id,
+        created_at and updated_at, on the row of cls with the id it holds
+        with one executemany and commits them"""
+        if isinstance(cls, str):
+            cls = classes[cls]
+        now = datetime.utcnow()
+        mappings = []
+        for row in rows:
+            mapping = {attr: value for attr, value in row.items()
+                       if attr not in ("created_at", "updated_at",
+                                       "__class__")}
+            mapping["updated_at"] = now
+            mappings.append(mapping)
+        self.__session.bulk_update_mappings(cls, mappings)
+        self.__session.commit()
+        self.__session.expire_all()
+
     def delete(self, obj=None):
         """delete from the current database session obj if not None"""
         if obj is not None:
             self.__session.delete(obj)
 
+    def pool_stats(self):
+        """returns the connection pool statistics, or None for the single
+        connection of an in-memory SQLite database"""
+        if isinstance(self.__engine.pool, TimedQueuePool):
+            return self.__engine.pool.stats()
+        return None
+
+    def to_json(self, obj):
+        """returns the JSON text of obj.to_dict()"""
+        return json.dumps(obj.to_dict())
+
     def reload(self):
         """reloads data from the database"""
         Base.metadata.create_all(self.__engine)
@@ -83,22 +209,177 @@ class DBStorage:
             id: string representing the object ID
         """
         if cls in classes.values():
-            objs_cls = models.storage.all(cls)
-            for object in objs_cls.values():
-                if object.id == id:
-                    return object
-            return None
+            return self.__session.get(cls, id)
         return None
 
-    def count(self, cls=None):
+    def __query(self, cls, attrs, *columns):
+        """returns a query for columns (cls itself by default) restricted to
+        the rows of cls whose attributes equal the values given in attrs"""
+        query = self.__session.query(*columns or (cls,))
+        for attr, value in attrs.items():
+            query = query.filter(getattr(cls, attr) == value)
+        return query
+
+    def iter(self, cls, attr=None, value=None):
+        """yields the objects of cls (only those whose attr is value if attr
+        is given) one at a time, fetching the rows in batches"""
+        if isinstance(cls, str):
+            cls = classes[cls]
+        attrs = {} if attr is None else {attr: value}
+        for obj in self.__query(cls, attrs).yield_per(1000):
+            yield obj
+
+    @staticmethod
+    def __eager(cls, load):
+        """returns the loader options for the relationships of cls named in
+        load, a sequence of (dotted) relationship paths loaded with
+        SELECT ... IN, or a dictionary of such paths to "selectin" or
+        "joined" """
+        if not isinstance(load, dict):
+            load = dict.fromkeys(load, "selectin")
+        options = []
+        for path, strategy in load.items():
+            option, owner = None, cls
+            for name in path.split("."):
+                attr = getattr(owner, name)
+                if option is None:
+                    option = loaders[strategy](attr)
+                else:
+                    option = getattr(option, strategy + "load")(attr)
+                owner = attr.property.mapper.class_
+            options.append(option)
+        return options
+
+    def filter(self, cls, order_by=None, limit=None, after=None, load=(),
+               **attrs):
+        """returns as a list the objects of cls whose attributes equal the
+        values given in attrs, sorted on order_by, starting after the value
+        after of order_by if given, and at most limit of them if limit is
+        given, all of it done by the database. The relationships named in
+        load are fetched along with the objects instead of one query per
+        object when first accessed"""
+        if isinstance(cls, str):
+            cls = classes[cls]
+        query = self.__query(cls, attrs).options(*self.__eager(cls, load))
+        if order_by is not None:
+            column = getattr(cls, order_by)
+            if after is not None:
+                query = query.filter(column > after)
+            query = query.order_by(column)
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
+
+    def ids(self, cls, attr, values):
+        """returns the set of the ids of the objects of cls whose attr is
+        one of values, Place amenity_ids standing for the amenities linked
+        to a place, in a single query"""
+        if isinstance(cls, str):
+            cls = classes[cls]
+        values = list(values)
+        if not values:
+            return set()
+        if cls is Place and attr == "amenity_ids":
+            link = Base.metadata.tables["place_amenity"].c
+            query = self.__session.query(link.place_id).filter(
+                link.amenity_id.in_(values))
+        else:
+            query = self.__session.query(cls.id).filter(
+                getattr(cls, attr).in_(values))
+        return {row[0] for row in query}
+
+    def search(self, cls, order_by=None, limit=None, **ranges):
+        """returns as a list the objects of cls whose numeric attributes lie
+        within the (low, high) bounds given in ranges, both included, None
+        leaving a bound open, sorted on order_by ("-" prefixed for
+        descending order) and at most limit of them if limit is given"""
+        if isinstance(cls, str):
+            cls = classes[cls]
+        query = self.__session.query(cls)
+        for attr, (low, high) in ranges.items():
+            column = getattr(cls, attr)
+            query = query.filter(column.isnot(None))
+            if low is not None:
+                query = query.filter(column >= low)
+            if high is not None:
+                query = query.filter(column <= high)
+        if order_by is not None:
+            column = getattr(cls, order_by.lstrip("-"))
+            query = query.filter(column.isnot(None)).order_by(
+                column.desc() if order_by.startswith("-") else column)
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
+
+    def __boxed(self, cls, south, west, north, east):
+        """returns the objects of cls located within a (south, west, north,
+        east) box, selected by the database"""
+        query = self.__session.query(cls).filter(
+            cls.latitude.between(south, north))
+        if west <= east:
+            query = query.filter(cls.longitude.between(west, east))
+        else:
+            query = query.filter(or_(cls.longitude >= west,
+                                     cls.longitude <= east))
+        return query.all()
+
+    def near(self, cls, latitude, longitude, radius, limit=None):
+        """returns as a list the objects of cls located within radius
+        kilometers of a point, nearest first, and at most limit of them"""
+        if isinstance(cls, str):
+            cls = classes[cls]
+        found = []
+        for obj in self.__boxed(cls, *bounds(latitude, longitude, radius)):
+            gap = distance(latitude, longitude, obj.latitude, obj.longitude)
+            if gap <= radius:
+                found.append((gap, obj))
+        found.sort(key=lambda pair: pair[0])
+        return [obj for gap, obj in found[:limit]]
+
+    def within(self, cls, south, west, north, east, latitude=None,
+               longitude=None, limit=None):
+        """returns as a list the objects of cls located within a (south,
+        west, north, east) box, in degrees, crossing the antimeridian when
+        west > east, nearest to a point first (the center of the box by
+        default), and at most limit of them"""
+        if isinstance(cls, str):
+            cls = classes[cls]
+        if latitude is None or longitude is None:
+            latitude, longitude = center(south, west, north, east)
+        found = [(distance(latitude, longitude, obj.latitude, obj.longitude),
+                  obj) for obj in self.__boxed(cls, south, west, north, east)]
+        found.sort(key=lambda pair: pair[0])
+        return [obj for gap, obj in found[:limit]]
+
+    def text_search(self, cls, query, limit=None, offset=0):
+        """returns as a list the objects of cls whose text attribute (Place
+        description, Review text) holds one of the words of query, best
+        BM25 match first, skipping the first offset of them and at most
+        limit of them
+
+        The database finds the rows holding the words with LIKE, and they
+        are ranked among themselves.
+        """
+        if isinstance(cls, str):
+            cls = classes[cls]
+        column = getattr(cls, text_attrs[cls.__name__])
+        words = set(tokenize(query))
+        if not words:
+            return []
+        rows = self.__session.query(cls.id, column).filter(
+            or_(*(column.ilike("%" + word + "%") for word in words)))
+        ids = TextIndex(rows).search(query, limit, offset)
+        if not ids:
+            return []
+        objs = {obj.id: obj for obj in self.__session.query(cls).filter(
+            cls.id.in_(ids))}
+        return [objs[id] for id in ids]
+
+    def count(self, cls=None, **attrs):
         """Returns the number of objects in storage matching the given class.
         If no class is passed, returns the count of all objects in storage.
+        Attribute values given in attrs narrow the count as in filter().
         """
-        if cls is None:
-            num_objct = len(models.storage.all())
-            return num_objct
-        else:
-            if cls in classes.values():
-                num_objct = len(models.storage.all(cls))
-                return num_objct
-            return len(models.storage.all())
+        if cls in classes.values():
+            return self.__query(cls, attrs, func.count(cls.id)).scalar()
+        return sum(self.count(clss) for clss in classes.values())
@@ -3,10 +3,20 @@
 Contains the FileStorage class
 """
 
+import bisect
+from datetime import datetime
 import json
+import math
 import models
+import os
+import re
+import sys
+import threading
+import time
 from models.amenity import Amenity
 from models.base_model import BaseModel
+from models.engine.columns import Columns
+from models.engine.text_index import TextIndex
 from models.city import City
 from models.place import Place
 from models.review import Review
@@ -15,6 +25,23 @@ from models.user import User
 
 classes = {"Amenity": Amenity, "BaseModel": BaseModel, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
+whitespace = re.compile(r"[ \t\n\r]*")
+
+
+def fsync_policy(value):
+    """returns the fsync policy an HBNB_FSYNC value stands for: "none",
+    "save" or a period in milliseconds, raising ValueError otherwise"""
+    policy = value.strip().lower()
+    if policy in ("none", "save"):
+        return policy
+    try:
+        period = float(policy)
+    except ValueError:
+        period = math.nan
+    if not 0 <= period < math.inf:
+        raise ValueError("HBNB_FSYNC must be none, save or a period in "
+                         "milliseconds, not {!r}".format(value))
+    return period
 
 
 class FileStorage:
@@ -22,53 +49,898 @@ class FileStorage:
 
     # string - path to the JSON file
     __file_path = "file.json"
+    # string - path to the journal of changes made since the JSON file
+    __log_path = "file.json.log"
+    # string - path to the text index of a class saved along with the JSON
+    # file, formatted with the class name
+    __text_path = "file.json.{}.idx"
+    # integer - journal size (bytes) that never triggers a compaction
+    __compact_min = 1 << 20
+    # integer - size (characters) of the reads made by reload
+    __chunk_size = 1 << 20
+    # string - fsync policy: "none", "save" or a period in milliseconds
+    __fsync = fsync_policy(os.getenv("HBNB_FSYNC", "none"))
+    # Timer - pending fsync of the journal under a periodic fsync policy
+    __sync_timer = None
+    # float - seconds a save waits for concurrent saves to join its write
+    __commit_delay = float(os.getenv("HBNB_COMMIT_DELAY_MS", 0)) / 1000
+    # Condition - guards the objects, the indexes and the pending changes
+    __lock = threading.Condition(threading.RLock())
+    # integer - save() calls made so far / covered by a finished write
+    __saves = 0
+    __flushed = 0
+    # boolean - whether a save() is currently writing
+    __flushing = False
+    # dictionary - last known state of the files: {path: signature}
+    __seen = {}
     # dictionary - empty but will store all objects by <class name>.id
     __objects = {}
+    # dictionary - the same objects partitioned by <class name>
+    __by_class = {}
+    # dictionary - records not instantiated yet: {<class name>: {key: JSON}}
+    __raw = {}
+    # dictionary - sorted keys of each class, built on first use
+    __ordered = {}
+    # dictionary - reverse indexes: {(<class name>, attr, value): {key: obj}}
+    __by_fk = {}
+    # dictionary - the reverse index entries each key is filed under
+    __fk_of = {}
+    # dictionary - the __objects dict that the indexes were built from
+    __indexed = None
+    # set - keys of the objects added, changed or deleted since last save
+    __pending = set()
+    # dictionary - JSON text of the to_dict() of each clean object by key
+    __fragments = {}
+    # boolean - whether the next save must rewrite the whole JSON file
+    __compact_needed = False
+    # dictionary - foreign key attributes reverse-indexed for each class
+    __fk_attrs = {"City": ("state_id",), "Place": ("city_id", "amenity_ids"),
+                  "Review": ("place_id",)}
+    # dictionary - Columns of each class, built on first search
+    __columns = {}
+    # dictionary - numeric attributes stored in the Columns of each class
+    __column_attrs = {"Place": ("number_rooms", "number_bathrooms",
+                                "max_guest", "price_by_night", "latitude",
+                                "longitude")}
+    # dictionary - latitude and longitude columns of the classes located
+    __grid_attrs = {"Place": ("latitude", "longitude")}
+    # dictionary - TextIndex of each class, loaded by reload or built on
+    # first text search
+    __texts = {}
+    # dictionary - text attribute indexed in the TextIndex of each class
+    __text_attrs = {"Place": "description", "Review": "text"}
+    # integer - bumped whenever the indexes built on first use are dropped
+    __generation = 0
+    # dictionary - keys changed while an index is being built, by
+    # (kind, <class name>)
+    __building = {}
+
+    def __index(self):
+        """returns __by_class, rebuilding the indexes if __objects was
+        replaced"""
+        if self.__indexed is not self.__objects:
+            if self.__indexed is not None:
+                FileStorage.__compact_needed = True
+            FileStorage.__by_class = {}
+            FileStorage.__raw = {}
+            FileStorage.__ordered = {}
+            FileStorage.__fragments = {}
+            FileStorage.__by_fk = {}
+            FileStorage.__fk_of = {}
+            FileStorage.__columns = {}
+            FileStorage.__texts = {}
+            FileStorage.__generation += 1
+            FileStorage.__indexed = self.__objects
+            for key, value in self.__objects.items():
+                self.__link(key, value)
+        return self.__by_class
+
+    def __link(self, key, obj):
+        """files obj under key in the class and reverse indexes"""
+        name = obj.__class__.__name__
+        self.__by_class.setdefault(name, {})[key] = obj
+        links = []
+        for attr in self.__fk_attrs.get(name, ()):
+            values = getattr(obj, attr, None)
+            if not isinstance(values, list):
+                values = [values]
+            for value in values:
+                if isinstance(value, str):
+                    link = (name, attr, value)
+                    self.__by_fk.setdefault(link, {})[key] = obj
+                    links.append(link)
+        self.__fk_of[key] = links
+        if name in self.__columns:
+            attrs = self.__column_attrs[name]
+            self.__columns[name].set(key, [getattr(obj, attr, None)
+                                           for attr in attrs])
+
+    def __numbers(self, name, text):
+        """returns the values of the column attributes of class name in the
+        JSON text of a record, class defaults standing for missing ones"""
+        record = json.loads(text)
+        defaults = getattr(classes[name], "_defaults", None) or \
+            vars(classes[name])
+        return [record.get(attr, defaults.get(attr))
+                for attr in self.__column_attrs[name]]
+
+    def __build(self, kind, name, make, refresh):
+        """returns the index of kind ("columns" or "texts") of class name,
+        making it on first use without holding the lock: make(name, objs,
+        raw, seen) gets copies of the objects and raw records of the class
+        and the signatures of the JSON file and journal they match (None if
+        some changes are unsaved), then refresh(index, key) brings the keys
+        changed meanwhile up to date. Threads asking for an index being
+        made wait for it"""
+        with self.__lock:
+            while True:
+                index = self.__built(kind).get(name)
+                if index is not None:
+                    return index
+                if (kind, name) not in self.__building:
+                    break
+                self.__lock.wait()
+            self.__index()
+            generation = self.__generation
+            changed = self.__building[(kind, name)] = set()
+            objs = dict(self.__by_class.get(name, {}))
+            raw = dict(self.__raw.get(name, {}))
+            seen = None
+            if not self.__pending:
+                seen = (self.__seen.get(self.__file_path),
+                        self.__seen.get(self.__log_path))
+        index = None
+        try:
+            index = make(name, objs, raw, seen)
+        finally:
+            with self.__lock:
+                del self.__building[(kind, name)]
+                if index is not None and generation == self.__generation:
+                    for key in changed:
+                        refresh(index, key)
+                    self.__built(kind)[name] = index
+                self.__lock.notify_all()
+        return index
+
+    def __built(self, kind):
+        """returns the indexes of kind built so far, by class name"""
+        return {"columns": self.__columns, "texts": self.__texts}[kind]
+
+    def __touch(self, key):
+        """notes that key changed for the indexes of its class being
+        built"""
+        for (kind, name), keys in self.__building.items():
+            if key.startswith(name + "."):
+                keys.add(key)
+
+    def __columns_of(self, name):
+        """returns the Columns of class name, building them on first use"""
+        return self.__build("columns", name, self.__make_columns,
+                            self.__recolumn)
+
+    def __make_columns(self, name, objs, raw, seen):
+        """returns the Columns of class name holding the objects objs and
+        the raw records raw"""
+        attrs = self.__column_attrs[name]
+        items = [(key, [getattr(obj, attr, None) for attr in attrs])
+                 for key, obj in objs.items()]
+        items.extend((key, self.__numbers(name, text))
+                     for key, text in raw.items())
+        return Columns(attrs, items, self.__grid_attrs.get(name))
+
+    def __recolumn(self, columns, key):
+        """brings the values of key in columns up to date"""
+        name = key.split(".")[0]
+        obj = self.__objects.get(key)
+        if obj is not None:
+            columns.set(key, [getattr(obj, attr, None)
+                              for attr in self.__column_attrs[name]])
+        elif key in self.__raw.get(name, {}):
+            columns.set(key, self.__numbers(name, self.__raw[name][key]))
+        else:
+            columns.discard(key)
+
+    def __text_of(self, name):
+        """returns the TextIndex of class name, building it on first use"""
+        return self.__build("texts", name, self.__make_text, self.__retext)
+
+    def __make_text(self, name, objs, raw, seen):
+        """returns the TextIndex of class name holding the objects objs and
+        the raw records raw, saved if seen gives what they match"""
+        attr = self.__text_attrs[name]
+        items = [(key, getattr(obj, attr, None)) for key, obj in objs.items()]
+        items.extend((key, json.loads(text).get(attr))
+                     for key, text in raw.items())
+        index = TextIndex(items)
+        if seen is not None:
+            self.__save_text(name, seen[0], seen[1], index.dump())
+        return index
+
+    def __retext(self, index, key):
+        """brings the words of key in index up to date"""
+        name = key.split(".")[0]
+        attr = self.__text_attrs[name]
+        obj = self.__objects.get(key)
+        if obj is not None:
+            index.set(key, getattr(obj, attr, None))
+        elif key in self.__raw.get(name, {}):
+            index.set(key, json.loads(self.__raw[name][key]).get(attr))
+        else:
+            index.discard(key)
+
+    def __save_text(self, name, snapshot, journal, dump):
+        """writes dump, the dump() of the TextIndex of class name, to its
+        __text_path through a temporary file, along with the signature of
+        the JSON file and the journal position it matches"""
+        path = self.__text_path.format(name)
+        try:
+            with open(path + ".tmp", 'w') as f:
+                f.write(json.dumps({"snapshot": snapshot,
+                                    "journal": journal, "text": dump}))
+            os.replace(path + ".tmp", path)
+        except OSError:
+            # the text index is only rebuilt on the next start
+            pass
+
+    def __load_texts(self):
+        """returns the TextIndex of each class saved at its __text_path,
+        leaving out those saved from another JSON file or journal than the
+        ones read"""
+        snapshot = self.__seen.get(self.__file_path)
+        log = self.__stat(self.__log_path)
+        texts = {}
+        for name in self.__text_attrs:
+            try:
+                with open(self.__text_path.format(name), 'r') as f:
+                    saved = json.load(f)
+                if saved["snapshot"] != (snapshot and list(snapshot)):
+                    continue
+                journal = saved["journal"]
+                if journal is not None and (log is None or
+                                            log[0] != journal[0] or
+                                            log[1] < journal[1]):
+                    continue
+                texts[name] = TextIndex(dump=saved["text"])
+            except (OSError, KeyError, TypeError, ValueError):
+                # missing, or not written by this version: rebuilt on
+                # first text search
+                continue
+        return texts
+
+    def __set_text(self, key, text):
+        """stores text under key in the TextIndex of its class if it is
+        built"""
+        index = self.__texts.get(key.split(".")[0])
+        if index is not None:
+            index.set(key, text)
+
+    def __unlink(self, key):
+        """removes key from the class and reverse indexes"""
+        for link in self.__fk_of.pop(key, ()):
+            bucket = self.__by_fk.get(link, {})
+            bucket.pop(key, None)
+            if not bucket:
+                self.__by_fk.pop(link, None)
+        self.__by_class.get(key.split(".")[0], {}).pop(key, None)
+
+    def __thaw(self, name, key=None):
+        """instantiates the records of class name still kept as raw JSON
+        text, or only the one stored under key"""
+        self.__index()
+        raw = self.__raw.get(name)
+        if not raw:
+            return
+        if key is None:
+            keys = list(raw)
+        elif key in raw:
+            keys = [key]
+        else:
+            return
+        for key in keys:
+            text = raw[key]
+            record = json.loads(text)
+            for attr in self.__fk_attrs.get(name, ()):
+                if isinstance(record.get(attr), str):
+                    record[attr] = sys.intern(record[attr])
+                elif isinstance(record.get(attr), list):
+                    record[attr] = [sys.intern(value)
+                                    if isinstance(value, str) else value
+                                    for value in record[attr]]
+            self.__put(key, classes[name](**record))
 
     def all(self, cls=None):
         """returns the dictionary __objects"""
-        if cls is not None:
-            new_dict = {}
-            for key, value in self.__objects.items():
-                if cls == value.__class__ or cls == value.__class__.__name__:
-                    new_dict[key] = value
-            return new_dict
-        return self.__objects
+        with self.__lock:
+            if cls is not None:
+                if not isinstance(cls, str):
+                    cls = cls.__name__
+                self.__thaw(cls)
+                return dict(self.__index().get(cls, {}))
+            for name in list(self.__raw):
+                self.__thaw(name)
+            return self.__objects
+
+    def all_by(self, cls, attr, value):
+        """returns the objects of cls whose attr is (or, for list
+        attributes, contains) value, as a dictionary like all(cls)"""
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        with self.__lock:
+            self.__thaw(cls)
+            if attr in self.__fk_attrs.get(cls, ()):
+                return dict(self.__by_fk.get((cls, attr, value), {}))
+        new_dict = {}
+        for key, obj in self.all(cls).items():
+            values = getattr(obj, attr, None)
+            if values == value or \
+                    isinstance(values, list) and value in values:
+                new_dict[key] = obj
+        return new_dict
+
+    def ids(self, cls, attr, values):
+        """returns the set of the ids of the objects of cls whose attr is
+        (or, for list attributes, contains) one of values, taken from the
+        reverse indexes for foreign keys"""
+        found = set()
+        for value in values:
+            found.update(key.split(".", 1)[1]
+                         for key in self.all_by(cls, attr, value))
+        return found
+
+    def __discard(self, key):
+        """drops whatever is stored under key, except from __ordered, and
+        returns whether there was anything"""
+        self.__index()
+        self.__touch(key)
+        self.__unlink(key)
+        found = self.__raw.get(key.split(".")[0], {}).pop(key, None)
+        self.__fragments.pop(key, None)
+        return self.__objects.pop(key, None) is not None or found is not None
+
+    def __put(self, key, obj):
+        """stores obj under key and files it in the indexes"""
+        if not self.__discard(key):
+            self.__order(key, True)
+        self.__link(key, obj)
+        self.__objects[key] = obj
+
+    def __remove(self, key):
+        """removes key from __objects and from the indexes, returning
+        whether anything, object or raw record, was stored under it"""
+        if not self.__discard(key):
+            return False
+        self.__order(key, False)
+        if key.split(".")[0] in self.__columns:
+            self.__columns[key.split(".")[0]].discard(key)
+        if key.split(".")[0] in self.__texts:
+            self.__texts[key.split(".")[0]].discard(key)
+        return True
+
+    def __put_raw(self, key, text):
+        """stores the JSON text of a record under key, replacing whatever
+        was stored there, without instantiating it"""
+        if not self.__discard(key):
+            self.__order(key, True)
+        self.__pending.discard(key)
+        name = key.split(".")[0]
+        self.__raw.setdefault(name, {})[key] = text
+        if name in self.__columns:
+            self.__columns[name].set(key, self.__numbers(name, text))
+        if name in self.__texts:
+            self.__set_text(key, json.loads(text).get(
+                self.__text_attrs[name]))
+
+    def __order(self, key, added):
+        """inserts key into (or deletes it from) the sorted keys of its
+        class, if they were built"""
+        keys = self.__ordered.get(key.split(".")[0])
+        if keys is None:
+            return
+        if added:
+            bisect.insort(keys, key)
+        else:
+            i = bisect.bisect_left(keys, key)
+            if i < len(keys) and keys[i] == key:
+                del keys[i]
+
+    def iter(self, cls, attr=None, value=None):
+        """yields the objects of cls (only those whose attr is value if attr
+        is given) one at a time, instantiating each when it is reached"""
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        with self.__lock:
+            if attr is not None:
+                keys = list(self.all_by(cls, attr, value))
+            else:
+                self.__index()
+                keys = list(self.__by_class.get(cls, {}))
+                keys.extend(self.__raw.get(cls, {}))
+        for key in keys:
+            with self.__lock:
+                self.__thaw(cls, key)
+                obj = self.__objects.get(key)
+            if obj is not None:
+                yield obj
+
+    def filter(self, cls, order_by=None, limit=None, after=None, load=(),
+               **attrs):
+        """returns as a list the objects of cls whose attributes equal (or,
+        for list attributes, contain) the values given in attrs, sorted on
+        order_by, starting after the value after of order_by if given, and
+        at most limit of them if limit is given. load is accepted for
+        DBStorage parity: relationships already come from the indexes"""
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        attrs = list(attrs.items())
+        with self.__lock:
+            if order_by == "id" and not attrs:
+                self.__index()
+                keys = self.__ordered.get(cls)
+                if keys is None:
+                    keys = list(self.__by_class.get(cls, {}))
+                    keys.extend(self.__raw.get(cls, {}))
+                    keys.sort()
+                    self.__ordered[cls] = keys
+                start = 0
+                if after is not None:
+                    start = bisect.bisect_right(keys, cls + "." + str(after))
+                end = None if limit is None else start + limit
+                objs = []
+                for key in keys[start:end]:
+                    self.__thaw(cls, key)
+                    objs.append(self.__objects[key])
+                return objs
+            if attrs:
+                objs = self.all_by(cls, *attrs[0]).values()
+            else:
+                objs = self.all(cls).values()
+        objs = [obj for obj in objs
+                if all(getattr(obj, attr, None) == value
+                       for attr, value in attrs[1:])]
+        if order_by is not None:
+            if after is not None:
+                objs = [obj for obj in objs if getattr(obj, order_by) > after]
+            objs.sort(key=lambda obj: getattr(obj, order_by))
+        return objs if limit is None else objs[:limit]
+
+    def search(self, cls, order_by=None, limit=None, **ranges):
+        """returns as a list the objects of cls whose numeric attributes lie
+        within the (low, high) bounds given in ranges, both included, None
+        leaving a bound open, sorted on order_by ("-" prefixed for
+        descending order) and at most limit of them if limit is given
+
+        Objects whose value of an attribute ranged or sorted on is not a
+        number are left out. Only the objects returned are instantiated.
+        """
+        return self.__from_columns(cls, Columns.select, ranges, order_by,
+                                   limit)
+
+    def __from_columns(self, cls, query, *args):
+        """returns the objects of the keys that query returns when called
+        with the Columns of cls and args"""
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        columns = self.__columns_of(cls)
+        with self.__lock:
+            objs = []
+            for key in query(columns, *args):
+                self.__thaw(cls, key)
+                if key in self.__objects:
+                    objs.append(self.__objects[key])
+            return objs
+
+    def near(self, cls, latitude, longitude, radius, limit=None):
+        """returns as a list the objects of cls located within radius
+        kilometers of a point, nearest first, and at most limit of them"""
+        return self.__from_columns(cls, Columns.near, latitude, longitude,
+                                   radius, limit)
+
+    def within(self, cls, south, west, north, east, latitude=None,
+               longitude=None, limit=None):
+        """returns as a list the objects of cls located within a (south,
+        west, north, east) box, in degrees, crossing the antimeridian when
+        west > east, nearest to a point first (the center of the box by
+        default), and at most limit of them"""
+        return self.__from_columns(cls, Columns.within, south, west, north,
+                                   east, latitude, longitude, limit)
+
+    def text_search(self, cls, query, limit=None, offset=0):
+        """returns as a list the objects of cls whose text attribute (Place
+        description, Review text) holds one of the words of query, best
+        BM25 match first, skipping the first offset of them and at most
+        limit of them
+
+        Only the objects returned are instantiated.
+        """
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        index = self.__text_of(cls)
+        with self.__lock:
+            objs = []
+            for key in index.search(query, limit, offset):
+                self.__thaw(cls, key)
+                if key in self.__objects:
+                    objs.append(self.__objects[key])
+            return objs
 
     def new(self, obj):
         """sets in __objects the obj with key <obj class name>.id"""
         if obj is not None:
             key = obj.__class__.__name__ + "." + obj.id
-            self.__objects[key] = obj
+            with self.__lock:
+                self.__put(key, obj)
+                self.__pending.add(key)
+                if obj.__class__.__name__ in self.__texts:
+                    self.__set_text(key, getattr(
+                        obj, self.__text_attrs[obj.__class__.__name__], None))
+
+    def bulk_new(self, objs):
+        """adds all of objs and saves them with a single journal append, or
+        adds none of them if one has no string id"""
+        objs = [obj for obj in objs if obj is not None]
+        for obj in objs:
+            if not isinstance(obj.id, str):
+                raise TypeError("id of {} is not a string".format(
+                    obj.__class__.__name__))
+        with self.__lock:
+            for obj in objs:
+                self.new(obj)
+        self.save()
+
+    def bulk_update(self, cls, rows):
+        """sets the attributes in each dictionary of rows, except id,
+        created_at and updated_at, on the stored object of cls with the id
+        it holds and saves them all with a single journal append"""
+        if isinstance(cls, str):
+            cls = classes[cls]
+        now = datetime.utcnow()
+        with self.__lock:
+            for row in rows:
+                obj = self.get(cls, row.get("id"))
+                if obj is None:
+                    continue
+                for attr, value in row.items():
+                    if attr not in ("id", "created_at", "updated_at",
+                                    "__class__"):
+                        setattr(obj, attr, value)
+                obj.updated_at = now
+        self.save()
+
+    def changed(self, obj, attr):
+        """marks a stored obj dirty after one of its attributes was set,
+        refreshing its reverse indexes if needed"""
+        name = obj.__class__.__name__
+        key = name + "." + str(getattr(obj, "id", None))
+        if self.__objects.get(key) is obj:
+            with self.__lock:
+                if attr in self.__fk_attrs.get(name, ()):
+                    self.__put(key, obj)
+                else:
+                    self.__touch(key)
+                    self.__fragments.pop(key, None)
+                    if attr in self.__column_attrs.get(name, ()) and \
+                            name in self.__columns:
+                        self.__link(key, obj)
+                    if attr == self.__text_attrs.get(name):
+                        self.__set_text(key, getattr(obj, attr, None))
+                self.__pending.add(key)
+
+    def to_json(self, obj):
+        """returns the JSON text of obj.to_dict(), cached until obj changes
+        if obj is stored"""
+        key = obj.__class__.__name__ + "." + str(obj.id)
+        with self.__lock:
+            if self.__objects.get(key) is obj:
+                return self.__encode(key, obj)
+        return json.dumps(obj.to_dict())
+
+    def pool_stats(self):
+        """returns None: there is no connection pool in front of a file"""
+        return None
+
+    def __encode(self, key, obj):
+        """returns the JSON text of obj.to_dict(), cached until obj changes"""
+        fragment = self.__fragments.get(key)
+        if fragment is None:
+            fragment = json.dumps(obj.to_dict())
+            self.__fragments[key] = fragment
+        return fragment
 
     def save(self):
-        """serializes __objects to the JSON file (path: __file_path)"""
-        json_objects = {}
-        for key in self.__objects:
-            json_objects[key] = self.__objects[key].to_dict()
-        with open(self.__file_path, 'w') as f:
-            json.dump(json_objects, f)
+        """appends the changes since the last save to the journal
+        (path: __log_path), compacting it into the JSON file once it
+        outgrows it
+
+        Concurrent saves are committed as a group: one caller writes the
+        changes of every save() made before its write started while the
+        others wait for that write instead of issuing their own.
+        """
+        with self.__lock:
+            FileStorage.__saves += 1
+            ticket = self.__saves
+            while self.__flushing and self.__flushed < ticket:
+                self.__lock.wait()
+            if self.__flushed >= ticket:
+                return
+            FileStorage.__flushing = True
+        done = False
+        try:
+            if self.__commit_delay:
+                time.sleep(self.__commit_delay)
+            with self.__lock:
+                target = self.__saves
+            self.__flush()
+            done = True
+        finally:
+            with self.__lock:
+                FileStorage.__flushing = False
+                if done:
+                    FileStorage.__flushed = target
+                self.__seen[self.__file_path] = self.__stat(self.__file_path)
+                log = self.__stat(self.__log_path)
+                self.__seen[self.__log_path] = log and log[:2]
+                self.__lock.notify_all()
+
+    def compact(self):
+        """serializes __objects to the JSON file (path: __file_path) and
+        empties the journal"""
+        with self.__lock:
+            FileStorage.__compact_needed = True
+        self.save()
+
+    def __flush(self):
+        """writes out the pending changes, either as journal records or as
+        a whole new JSON file, holding the lock only to collect them"""
+        with self.__lock:
+            self.__index()
+            compact = self.__compact_needed
+            keys = set(self.__pending)
+            if compact:
+                entries = []
+                for key, obj in self.__objects.items():
+                    entries.append(json.dumps(key) + ": " +
+                                   self.__encode(key, obj))
+                for raw in self.__raw.values():
+                    for key, text in raw.items():
+                        entries.append(json.dumps(key) + ": " + text)
+                texts = {name: index.dump()
+                         for name, index in self.__texts.items()}
+            else:
+                records = []
+                for key in keys:
+                    obj = self.__objects.get(key)
+                    value = "null"
+                    if obj is not None:
+                        value = self.__encode(key, obj)
+                    records.append("[" + json.dumps(key) + ", " + value +
+                                   "]\n")
+            self.__pending.clear()
+            FileStorage.__compact_needed = False
+        try:
+            if compact:
+                snapshot = self.__write_snapshot("{" + ", ".join(entries) +
+                                                 "}")
+                for name, dump in texts.items():
+                    self.__save_text(name, snapshot, None, dump)
+            elif records:
+                with open(self.__log_path, 'a') as f:
+                    f.write("".join(records))
+                    if self.__fsync == "save":
+                        f.flush()
+                        os.fsync(f.fileno())
+        except BaseException:
+            with self.__lock:
+                self.__pending.update(keys)
+                if compact:
+                    FileStorage.__compact_needed = True
+            raise
+        if not compact and records and self.__fsync not in ("none", "save"):
+            self.__sync_later()
+        log_size = self.__size(self.__log_path)
+        if log_size > max(self.__size(self.__file_path), self.__compact_min):
+            with self.__lock:
+                FileStorage.__compact_needed = True
+            self.__flush()
+
+    def __write_snapshot(self, text):
+        """replaces the JSON file with text through a temporary file, so
+        that readers see either the old or the new file, and drops the
+        journal it supersedes, returning the signature of the new file"""
+        tmp_path = self.__file_path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(text)
+            if self.__fsync != "none":
+                f.flush()
+                os.fsync(f.fileno())
+        snapshot = self.__stat(tmp_path)
+        with self.__lock:
+            os.replace(tmp_path, self.__file_path)
+            if os.path.exists(self.__log_path):
+                os.remove(self.__log_path)
+        if self.__fsync != "none":
+            directory = os.path.dirname(os.path.abspath(self.__file_path))
+            fd = os.open(directory, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        return snapshot
+
+    def __sync_later(self):
+        """schedules an fsync of the journal at the end of the current
+        period, unless one is already scheduled"""
+        with self.__lock:
+            if self.__sync_timer is not None:
+                return
+            timer = threading.Timer(self.__fsync / 1000,
+                                    self.__sync_log)
+            timer.daemon = True
+            FileStorage.__sync_timer = timer
+            timer.start()
+
+    def __sync_log(self):
+        """fsyncs the journal; run by the timer of __sync_later"""
+        with self.__lock:
+            FileStorage.__sync_timer = None
+        try:
+            with open(self.__log_path, 'a') as f:
+                os.fsync(f.fileno())
+        except OSError:
+            pass
+
+    @staticmethod
+    def __stat(path):
+        """returns (inode, size, mtime) of the file at path, or None if it
+        does not exist"""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    @staticmethod
+    def __size(path):
+        """returns the size of the file at path, 0 if it does not exist"""
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
 
     def reload(self):
-        """deserializes the JSON file to __objects"""
+        """deserializes the JSON file to __objects, then replays the
+        journal over it
+
+        Records are read a chunk at a time and kept as JSON text until
+        their object is first asked for through all(), all_by() or get().
+        The text indexes saved along with the JSON file are loaded if they
+        match it, and the journal and unsaved changes replayed over them.
+        """
+        with self.__lock:
+            FileStorage.__ordered = {}
+            FileStorage.__columns = {}
+            FileStorage.__texts = {}
+            FileStorage.__generation += 1
+            try:
+                with open(self.__file_path, 'r') as f:
+                    st = os.fstat(f.fileno())
+                    for key, text in self.__scan(f):
+                        self.__put_raw(key, text)
+                self.__seen[self.__file_path] = (st.st_ino, st.st_size,
+                                                 st.st_mtime_ns)
+            except FileNotFoundError:
+                self.__seen[self.__file_path] = None
+            FileStorage.__texts = self.__load_texts()
+            for key in self.__pending:
+                name = key.split(".")[0]
+                if name in self.__texts and key in self.__objects:
+                    self.__set_text(key, getattr(self.__objects[key],
+                                                 self.__text_attrs[name],
+                                                 None))
+            self.__replay(0)
+
+    def __replay(self, offset):
+        """replays the journal records found past offset (bytes), stopping
+        before an append still in progress"""
         try:
-            with open(self.__file_path, 'r') as f:
-                jo = json.load(f)
-            for key in jo:
-                self.__objects[key] = classes[jo[key]["__class__"]](**jo[key])
+            f = open(self.__log_path, 'rb')
         except FileNotFoundError:
-            pass
+            self.__seen[self.__log_path] = None
+            return
+        with f:
+            inode = os.fstat(f.fileno()).st_ino
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                offset += len(line)
+                try:
+                    key, text = self.__parse_record(line.decode())
+                except ValueError:
+                    # torn record left by an interrupted append
+                    continue
+                if text is None:
+                    self.__remove(key)
+                    self.__pending.discard(key)
+                else:
+                    self.__put_raw(key, text)
+        self.__seen[self.__log_path] = (inode, offset)
+
+    def __scan(self, f):
+        """yields (key, JSON text of the value) for each member of the JSON
+        object in file f, reading it a chunk at a time"""
+        decode = json.JSONDecoder().raw_decode
+        buf = f.read(self.__chunk_size)
+        pos = whitespace.match(buf).end()
+        if buf[pos:pos + 1] != "{":
+            raise json.JSONDecodeError("Expecting '{'", buf, pos)
+        pos += 1
+        while True:
+            try:
+                pos = whitespace.match(buf, pos).end()
+                if buf[pos] == ",":
+                    pos = whitespace.match(buf, pos + 1).end()
+                if buf[pos] == "}":
+                    return
+                key, end = decode(buf, pos)
+                end = whitespace.match(buf, end).end()
+                if buf[end] != ":":
+                    raise json.JSONDecodeError("Expecting ':'", buf, end)
+                start = whitespace.match(buf, end + 1).end()
+                value, end = decode(buf, start)
+            except (IndexError, json.JSONDecodeError):
+                # the record runs past the end of the buffer
+                chunk = f.read(self.__chunk_size)
+                if not chunk:
+                    raise json.JSONDecodeError("Unterminated object", buf, pos)
+                buf = buf[pos:] + chunk
+                pos = 0
+                continue
+            yield key, buf[start:end]
+            pos = end
+
+    @staticmethod
+    def __parse_record(line):
+        """returns (key, JSON text of the value or None) for a journal line
+        [key, value], raising ValueError if it is incomplete"""
+        decode = json.JSONDecoder().raw_decode
+        if not line.startswith("["):
+            raise ValueError("not a journal record")
+        key, pos = decode(line, 1)
+        pos = whitespace.match(line, pos).end()
+        if line[pos:pos + 1] != ",":
+            raise ValueError("not a journal record")
+        start = whitespace.match(line, pos + 1).end()
+        value, end = decode(line, start)
+        if line[end:].strip() != "]":
+            raise ValueError("not a journal record")
+        return key, None if value is None else line[start:end]
 
     def delete(self, obj=None):
         """delete obj from __objects if it’s inside"""
         if obj is not None:
             key = obj.__class__.__name__ + '.' + obj.id
-            if key in self.__objects:
-                del self.__objects[key]
+            with self.__lock:
+                if self.__remove(key):
+                    self.__pending.add(key)
 
     def close(self):
-        """call reload() method for deserializing the JSON file to objects"""
-        self.reload()
+        """reloads what another process changed in the JSON file or the
+        journal since this one last read or wrote them: only the new
+        journal records if just the journal grew, everything otherwise"""
+        with self.__lock:
+            if self.__flushing:
+                return
+            snapshot = self.__stat(self.__file_path)
+            if snapshot != self.__seen.get(self.__file_path):
+                self.reload()
+                return
+            log = self.__stat(self.__log_path)
+            seen = self.__seen.get(self.__log_path)
+            if seen is not None and (log is None or log[0] != seen[0] or
+                                     log[1] < seen[1]):
+                self.reload()
+            elif log is not None and (seen is None or log[1] > seen[1]):
+                self.__replay(0 if seen is None else seen[1])
 
     def get(self, cls, id):
         """Returns the object based on the class and its ID,
@@ -78,22 +950,24 @@ class FileStorage:
             id: string representing the object ID
         """
         if cls in classes.values():
-            objs_cls = models.storage.all(cls)
-            for object in objs_cls.values():
-                if object.id == id:
-                    return object
-            return None
+            key = cls.__name__ + "." + str(id)
+            with self.__lock:
+                self.__thaw(cls.__name__, key)
+                return self.__objects.get(key)
         return None
 
-    def count(self, cls=None):
+    def count(self, cls=None, **attrs):
         """Returns the number of objects in storage matching the given class.
         If no class is passed, returns the count of all objects in storage.
+        Attribute values given in attrs narrow the count as in filter().
         """
-        if cls is None:
-            num_objct = len(models.storage.all())
-            return num_objct
-        else:
+        if attrs and cls in classes.values():
+            return len(self.filter(cls, **attrs))
+        with self.__lock:
+            self.__index()
             if cls in classes.values():
-                num_objct = len(models.storage.all(cls))
-                return num_objct
-            return len(models.storage.all())
+                name = cls.__name__
+                return len(self.__by_class.get(name, {})) + \
+                    len(self.__raw.get(name, {}))
+            return len(self.__objects) + \
+                sum(len(raw) for raw in self.__raw.values())
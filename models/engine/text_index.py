@@ -0,0 +1,142 @@
+#!/usr/bin/python3
+"""
+Contains the TextIndex class
+"""
+
+from collections import Counter
+import heapq
+import math
+import re
+
+word = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """returns the lowercase words of text, or none if it is not a string"""
+    if not isinstance(text, str):
+        return []
+    return word.findall(text.lower())
+
+
+class TextIndex:
+    """inverted index of one text attribute of the objects of a class: for
+    each word, the posting list of the rows of the keys whose text holds
+    it, along with how many times, and for each row the length of its text
+    and its words, space separated, to take it out of the posting lists
+
+    Keys are ranked against a query with Okapi BM25.
+    """
+
+    # float - saturation of the word counts in BM25
+    k1 = 1.2
+    # float - weight of the text length normalization in BM25
+    b = 0.75
+
+    def __init__(self, items=(), dump=None):
+        """Instantiate the index of items, pairs of a key and of its text,
+        or of what dump() returned"""
+        self.__keys = []
+        self.__rows = {}
+        self.__free = []
+        self.__lengths = []
+        self.__words = []
+        self.__postings = {}
+        if dump is not None:
+            self.__keys = dump["keys"]
+            self.__lengths = dump["lengths"]
+            self.__words = dump["words"]
+            self.__postings = {term: dict(zip(*posting))
+                               for term, posting in dump["postings"].items()}
+            for row, key in enumerate(self.__keys):
+                if key is None:
+                    self.__free.append(row)
+                else:
+                    self.__rows[key] = row
+        self.__total = sum(self.__lengths)
+        for key, text in items:
+            self.set(key, text)
+
+    def __len__(self):
+        """returns the number of keys stored"""
+        return len(self.__rows)
+
+    def dump(self):
+        """returns the index as lists and dictionaries of strings and
+        integers, from which it can be instantiated again"""
+        return {"keys": list(self.__keys), "lengths": list(self.__lengths),
+                "words": list(self.__words),
+                "postings": {term: [list(posting), list(posting.values())]
+                             for term, posting in self.__postings.items()}}
+
+    def set(self, key, text):
+        """stores the words of text for key, replacing those it had"""
+        self.discard(key)
+        if self.__free:
+            row = self.__free.pop()
+            self.__keys[row] = key
+        else:
+            row = len(self.__keys)
+            self.__keys.append(key)
+            self.__lengths.append(0)
+            self.__words.append("")
+        self.__rows[key] = row
+        terms = tokenize(text)
+        counts = Counter(terms)
+        self.__lengths[row] = len(terms)
+        self.__total += len(terms)
+        self.__words[row] = " ".join(counts)
+        postings = self.__postings
+        for term, count in counts.items():
+            posting = postings.get(term)
+            if posting is None:
+                postings[term] = {row: count}
+            else:
+                posting[row] = count
+
+    def discard(self, key):
+        """removes key and its words if they are stored"""
+        row = self.__rows.pop(key, None)
+        if row is None:
+            return
+        for term in self.__words[row].split():
+            posting = self.__postings[term]
+            del posting[row]
+            if not posting:
+                del self.__postings[term]
+        self.__total -= self.__lengths[row]
+        self.__lengths[row] = 0
+        self.__words[row] = ""
+        self.__keys[row] = None
+        self.__free.append(row)
+
+    def search(self, query, limit=None, offset=0):
+        """returns the keys whose text holds one of the words of query,
+        best BM25 score first (ties by key), skipping the first offset of
+        them and at most limit of them
+
+        Only the posting lists of the words of query are read.
+        """
+        documents = len(self.__rows)
+        if not documents:
+            return []
+        average = self.__total / documents or 1.0
+        lengths = self.__lengths
+        scores = {}
+        for term in set(tokenize(query)):
+            posting = self.__postings.get(term)
+            if not posting:
+                continue
+            found = len(posting)
+            idf = math.log(1 + (documents - found + 0.5) / (found + 0.5))
+            weight = idf * (self.k1 + 1)
+            base = self.k1 * (1 - self.b)
+            scale = self.k1 * self.b / average
+            for row, count in posting.items():
+                scores[row] = scores.get(row, 0.0) + weight * count / (
+                    count + base + scale * lengths[row])
+        ranked = ((-score, self.__keys[row]) for row, score in scores.items())
+        if limit is None:
+            ranked = sorted(ranked)
+        else:
+            ranked = heapq.nsmallest(offset + limit, ranked)
+        return [key for score, key in ranked[offset:]]
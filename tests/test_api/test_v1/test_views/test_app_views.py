@@ -0,0 +1,221 @@
+#!/usr/bin/python3
+"""
+Contains the tests of the helpers that the views of app_views share
+"""
+
+from api.v1.app import app
+from api.v1 import views
+import json
+import models
+from models.city import City
+from models.state import State
+import pep8
+import unittest
+from unittest import mock
+
+
+class TestAppViewsDocs(unittest.TestCase):
+    """Tests to check the documentation and style of app_views"""
+
+    def test_pep8_conformance_test_app_views(self):
+        """Test tests/test_api/test_v1/test_views/test_app_views.py conforms
+        to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_api/test_v1/test_views/\
+test_app_views.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_app_views_func_docstrings(self):
+        """Test for the presence of docstrings in the helpers"""
+        for func in (views.limit_arg, views.paginate, views.conditional,
+                     views.serialize, views.stream):
+            self.assertTrue(func.__doc__ and len(func.__doc__) >= 1,
+                            "{:s} needs a docstring".format(func.__name__))
+
+
+class TestAppViews(unittest.TestCase):
+    """Base of the tests of the helpers: a state of two cities"""
+
+    def setUp(self):
+        """Create the objects listed and a test client"""
+        self.client = app.test_client()
+        self.state = State(name="Served")
+        self.state.save()
+        self.cities = [City(name="Served_{}".format(i),
+                            state_id=self.state.id) for i in range(2)]
+        for city in self.cities:
+            city.save()
+        models.storage.close()
+
+    def tearDown(self):
+        """Delete the objects the tests created"""
+        for city in models.storage.all(City).values():
+            if city.state_id == self.state.id:
+                models.storage.delete(city)
+        models.storage.delete(models.storage.get(State, self.state.id))
+        models.storage.save()
+
+
+class TestConditional(TestAppViews):
+    """Test the ETag and Last-Modified of the responses of conditional()"""
+
+    def test_if_none_match(self):
+        """Test a GET with the ETag of the object gets a 304, empty"""
+        url = "/api/v1/states/" + self.state.id
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers["ETag"]
+        response = self.client.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.get_data(), b"")
+        self.assertEqual(response.headers["ETag"], etag)
+        response = self.client.get(url, headers={"If-None-Match": '"other"'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_etag_follows_put(self):
+        """Test the ETag of an object changes once it is updated"""
+        url = "/api/v1/states/" + self.state.id
+        etag = self.client.get(url).headers["ETag"]
+        response = self.client.put(url, json={"name": "Served_renamed"})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+        response = self.client.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["name"], "Served_renamed")
+
+    def test_etag_follows_list(self):
+        """Test the ETag of a list changes as objects join or leave it"""
+        url = "/api/v1/states/{}/cities".format(self.state.id)
+        first = self.client.get(url).headers["ETag"]
+        self.assertEqual(self.client.get(url).headers["ETag"], first)
+        response = self.client.post(url, json={"name": "Served_2"})
+        self.assertEqual(response.status_code, 201)
+        added = self.client.get(url).headers["ETag"]
+        self.assertNotEqual(added, first)
+        response = self.client.delete("/api/v1/cities/" +
+                                      self.cities[0].id)
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(url, headers={"If-None-Match": added})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(response.headers["ETag"], (first, added))
+        self.assertEqual(len(response.get_json()), 2)
+
+    def test_if_modified_since(self):
+        """Test a GET with the Last-Modified of the object gets a 304"""
+        url = "/api/v1/states/" + self.state.id
+        modified = self.client.get(url).headers["Last-Modified"]
+        response = self.client.get(url,
+                                   headers={"If-Modified-Since": modified})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.get_data(), b"")
+        response = self.client.get(url, headers={
+            "If-Modified-Since": "Mon, 01 Jan 2001 00:00:00 GMT"})
+        self.assertEqual(response.status_code, 200)
+
+    def test_list_not_modified_since(self):
+        """Test a list has no Last-Modified, so that the removal of a member
+        is never answered with a 304"""
+        url = "/api/v1/states/{}/cities".format(self.state.id)
+        response = self.client.get(url)
+        self.assertNotIn("Last-Modified", response.headers)
+        modified = self.client.get("/api/v1/states/" +
+                                   self.state.id).headers["Last-Modified"]
+        newest = max(self.cities, key=lambda city: city.updated_at)
+        response = self.client.delete("/api/v1/cities/" + newest.id)
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(url, headers={
+            "If-Modified-Since": "Fri, 31 Dec 9999 23:59:59 GMT"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([city["id"] for city in response.get_json()],
+                         [city.id for city in self.cities
+                          if city is not newest])
+        response = self.client.get(url,
+                                   headers={"If-Modified-Since": modified})
+        self.assertEqual(response.status_code, 200)
+
+    def test_not_get(self):
+        """Test requests other than GET are never answered with a 304"""
+        url = "/api/v1/states/" + self.state.id
+        response = self.client.get(url)
+        headers = {"If-None-Match": response.headers["ETag"],
+                   "If-Modified-Since": response.headers["Last-Modified"]}
+        response = self.client.put(url, json={}, headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["id"], self.state.id)
+        response = self.client.post("/api/v1/states/{}/cities".format(
+            self.state.id), json={"name": "Served_2"}, headers=headers)
+        self.assertEqual(response.status_code, 201)
+
+
+class TestPaginate(TestAppViews):
+    """Test the pages of objects paginate() returns"""
+
+    def pages(self, url):
+        """Returns the ids of the objects of each page of url, following
+        the Link header from one to the next"""
+        pages = []
+        while url is not None:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            pages.append([obj["id"] for obj in response.get_json()])
+            link = response.headers.get("Link")
+            url = None
+            if link is not None:
+                self.assertIn("cursor=" + response.headers["X-Next-Cursor"],
+                              link)
+                url = link[1:link.index(">")]
+        return pages
+
+    def test_pages(self):
+        """Test following the next cursor lists every object once, by id"""
+        ids = sorted(state.id for state in
+                     models.storage.all(State).values())
+        pages = self.pages("/api/v1/states?limit=2")
+        self.assertTrue(all(len(page) == 2 for page in pages[:-1]))
+        self.assertEqual([id for page in pages for id in page], ids)
+        self.assertEqual(self.pages("/api/v1/states/{}/cities?limit=1"
+                                    .format(self.state.id)),
+                         [[city.id] for city in
+                          sorted(self.cities, key=lambda city: city.id)])
+
+    def test_cursor(self):
+        """Test a cursor alone starts a page of the default size after it"""
+        first = min(self.cities, key=lambda city: city.id)
+        response = self.client.get("/api/v1/states/{}/cities?cursor={}"
+                                   .format(self.state.id, first.id))
+        self.assertEqual([city["id"] for city in response.get_json()],
+                         [city.id for city in self.cities
+                          if city is not first])
+        self.assertNotIn("X-Next-Cursor", response.headers)
+
+    def test_invalid_limit(self):
+        """Test a limit that is not a positive integer is refused"""
+        for limit in ("0", "-1", "two"):
+            response = self.client.get("/api/v1/states?limit=" + limit)
+            self.assertEqual(response.status_code, 400)
+
+
+class TestStream(TestAppViews):
+    """Test the lists stream() sends"""
+
+    def test_stream(self):
+        """Test an unpaginated list is the full list, sent in chunks"""
+        with mock.patch("api.v1.views.CHUNK_SIZE", 1):
+            response = self.client.get("/api/v1/states", buffered=False)
+            self.assertTrue(response.is_streamed)
+            chunks = list(response.response)
+            response.close()
+        self.assertEqual(len(chunks), models.storage.count(State) + 1)
+        states = json.loads(b"".join(chunks))
+        self.assertCountEqual([state["id"] for state in states],
+                              [state.id for state in
+                               models.storage.all(State).values()])
+
+    def test_empty(self):
+        """Test an empty list is streamed as an empty JSON array"""
+        city = self.cities[0]
+        response = self.client.get("/api/v1/cities/{}/places".format(
+            city.id))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), [])
@@ -0,0 +1,110 @@
+#!/usr/bin/python3
+"""
+Contains the TestBatchDocs and TestBatch classes
+"""
+
+from api.v1.app import app
+from api.v1.views import batch
+import models
+from models.city import City
+from models.state import State
+import pep8
+import unittest
+
+
+class TestBatchDocs(unittest.TestCase):
+    """Tests to check the documentation and style of the batch view"""
+
+    def test_pep8_conformance_batch(self):
+        """Test that api/v1/views/batch.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['api/v1/views/batch.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_batch(self):
+        """Test tests/test_api/test_v1/test_views/test_batch.py conforms to
+        PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_api/test_v1/test_views/\
+test_batch.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_batch_module_docstring(self):
+        """Test for the batch.py module docstring"""
+        self.assertIsNot(batch.__doc__, None,
+                         "batch.py needs a docstring")
+        self.assertTrue(len(batch.__doc__) >= 1,
+                        "batch.py needs a docstring")
+
+
+class TestBatch(unittest.TestCase):
+    """Test POST /api/v1/batch"""
+
+    def setUp(self):
+        """Create a stored state and a test client"""
+        self.client = app.test_client()
+        self.state = State(name="Batched_state")
+        self.state.save()
+
+    def tearDown(self):
+        """Delete the objects the tests created"""
+        for cls in (City, State):
+            for obj in list(models.storage.all(cls).values()):
+                if obj.name.startswith("Batched"):
+                    models.storage.delete(obj)
+        models.storage.save()
+
+    def test_create(self):
+        """Test parents and children are created in one request"""
+        count = models.storage.count(City)
+        response = self.client.post("/api/v1/batch", json={
+            "states": [{"id": "batched-state", "name": "Batched_new"}],
+            "cities": [{"state_id": "batched-state", "name": "Batched_1"},
+                       {"state_id": self.state.id, "name": "Batched_2"}]})
+        self.assertEqual(response.status_code, 201)
+        body = response.get_json()
+        self.assertEqual([state["id"] for state in body["states"]],
+                         ["batched-state"])
+        self.assertEqual([city["name"] for city in body["cities"]],
+                         ["Batched_1", "Batched_2"])
+        self.assertEqual(models.storage.count(City), count + 2)
+        self.assertEqual(models.storage.get(State, "batched-state").name,
+                         "Batched_new")
+
+    def test_invalid(self):
+        """Test bad bodies are refused before anything is created"""
+        count = models.storage.count()
+        for body, status in (([], 400), ({"countries": []}, 400),
+                             ({"states": {}}, 400), ({"states": [1]}, 400),
+                             ({"cities": [{"name": "Batched"}]}, 400),
+                             ({"states": [{"name": "Batched_first"},
+                                          {"id": 5, "name": "Batched"}]},
+                              400),
+                             ({"states": [{"id": ["a"], "name": "Batched"}]},
+                              400),
+                             ({"cities": [{"state_id": {"a": 1},
+                                           "name": "Batched"}]}, 400),
+                             ({"places": [{"city_id": "nowhere",
+                                           "user_id": None,
+                                           "name": "Batched"}]}, 400),
+                             ({"cities": [{"state_id": "nowhere",
+                                           "name": "Batched"}]}, 404)):
+            response = self.client.post("/api/v1/batch", json=body)
+            self.assertEqual(response.status_code, status, body)
+        models.storage.save()
+        self.assertEqual(models.storage.count(), count)
+
+    def test_duplicate_id(self):
+        """Test ids already stored or repeated in the request are refused"""
+        count = models.storage.count(State)
+        for states in ([{"id": self.state.id, "name": "Batched_clobber"}],
+                       [{"id": "batched-twice", "name": "Batched_1"},
+                        {"id": "batched-twice", "name": "Batched_2"}]):
+            response = self.client.post("/api/v1/batch",
+                                        json={"states": states})
+            self.assertEqual(response.status_code, 409)
+        self.assertEqual(models.storage.count(State), count)
+        self.assertEqual(models.storage.get(State, self.state.id).name,
+                         "Batched_state")
@@ -0,0 +1,167 @@
+#!/usr/bin/python3
+"""
+Contains the TestPlacesDocs, TestPlacesSearch and TestPlacesNear classes
+"""
+
+from api.v1.app import app
+from api.v1.views import places
+import models
+from models.amenity import Amenity
+from models.city import City
+from models.place import Place
+from models.state import State
+from models.user import User
+import pep8
+import unittest
+
+
+class TestPlacesDocs(unittest.TestCase):
+    """Tests to check the documentation and style of the places view"""
+
+    def test_pep8_conformance_places(self):
+        """Test that api/v1/views/places.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['api/v1/views/places.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_places(self):
+        """Test tests/test_api/test_v1/test_views/test_places.py conforms to
+        PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_api/test_v1/test_views/\
+test_places.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_places_module_docstring(self):
+        """Test for the places.py module docstring"""
+        self.assertIsNot(places.__doc__, None,
+                         "places.py needs a docstring")
+        self.assertTrue(len(places.__doc__) >= 1,
+                        "places.py needs a docstring")
+
+
+class TestPlacesView(unittest.TestCase):
+    """Base of the tests of the places view: a state of two cities, each
+    with places, and amenities"""
+
+    def setUp(self):
+        """Create the objects listed and a test client"""
+        self.client = app.test_client()
+        self.user = User(email="viewed@mail.com", password="pwd")
+        self.state = State(name="Viewed")
+        self.cities = [City(name="Viewed_{}".format(i),
+                            state_id=self.state.id) for i in range(2)]
+        self.amenities = [Amenity(name="Viewed_{}".format(i))
+                          for i in range(2)]
+        self.places = [Place(name="Viewed_{}".format(i),
+                             city_id=self.cities[i % 2].id,
+                             user_id=self.user.id) for i in range(4)]
+        for obj in [self.user, self.state] + self.cities + self.amenities:
+            obj.save()
+        for i, place in enumerate(self.places):
+            for amenity in self.amenities[:i % 3]:
+                if models.storage_t == "db":
+                    place.amenities.append(amenity)
+                else:
+                    place.amenity_ids = place.amenity_ids + [amenity.id]
+            place.save()
+        models.storage.close()
+
+    def tearDown(self):
+        """Delete the objects setUp created"""
+        for obj in self.places + self.cities + [self.state, self.user] + \
+                self.amenities:
+            models.storage.delete(models.storage.get(type(obj), obj.id))
+        models.storage.save()
+
+    def names(self, response):
+        """Returns the names of the places of the JSON list of response
+        that setUp created, in order"""
+        self.assertEqual(response.status_code, 200)
+        ids = [place.id for place in self.places]
+        return [place["name"] for place in response.get_json()
+                if place["id"] in ids]
+
+
+class TestPlacesSearch(TestPlacesView):
+    """Test POST /api/v1/places_search"""
+
+    def search(self, body):
+        """Returns the names of the places setUp created that body finds,
+        sorted"""
+        return sorted(self.names(self.client.post("/api/v1/places_search",
+                                                  json=body)))
+
+    def test_filters(self):
+        """Test states, cities and amenities narrow the places found"""
+        everything = ["Viewed_0", "Viewed_1", "Viewed_2", "Viewed_3"]
+        self.assertEqual(self.search({}), everything)
+        self.assertEqual(self.search({"states": [self.state.id]}),
+                         everything)
+        self.assertEqual(self.search({"cities": [self.cities[1].id]}),
+                         ["Viewed_1", "Viewed_3"])
+        self.assertEqual(self.search({"amenities": [self.amenities[0].id]}),
+                         ["Viewed_1", "Viewed_2"])
+        self.assertEqual(self.search({"cities": [self.cities[0].id],
+                                      "amenities": [a.id for a in
+                                                    self.amenities]}),
+                         ["Viewed_2"])
+
+    def test_invalid(self):
+        """Test bodies that are not JSON objects of lists of ids"""
+        for body in ([], {"states": "all"}, {"states": [{"a": 1}]},
+                     {"cities": [None]}, {"amenities": [1]}):
+            response = self.client.post("/api/v1/places_search", json=body)
+            self.assertEqual(response.status_code, 400, body)
+
+
+class TestPlacesNear(TestPlacesView):
+    """Test GET /api/v1/places_near and GET /api/v1/places_within"""
+
+    points = ((48.8566, 2.3522), (48.8049, 2.1204), (-18.1248, 178.4501),
+              (-13.8333, -171.7667))
+
+    def setUp(self):
+        """Locate the places of TestPlacesView: Paris, Versailles, Suva
+        and Apia"""
+        super().setUp()
+        for place, (latitude, longitude) in zip(self.places, self.points):
+            place = models.storage.get(Place, place.id)
+            place.latitude = latitude
+            place.longitude = longitude
+            place.save()
+        models.storage.close()
+
+    def test_near(self):
+        """Test the places within a radius are listed nearest first"""
+        url = "/api/v1/places_near?latitude=48.86&longitude=2.34&radius="
+        self.assertEqual(self.names(self.client.get(url + "30")),
+                         ["Viewed_0", "Viewed_1"])
+        self.assertEqual(self.names(self.client.get(url + "1")),
+                         ["Viewed_0"])
+        response = self.client.get(url + "30&limit=1")
+        self.assertEqual(len(response.get_json()), 1)
+
+    def test_within(self):
+        """Test the places within a box are listed nearest to its center
+        or to the point given first"""
+        url = "/api/v1/places_within?south=-20&west=170&north=-10&east=-170"
+        self.assertEqual(self.names(self.client.get(url)),
+                         ["Viewed_2", "Viewed_3"])
+        self.assertEqual(self.names(self.client.get(
+            url + "&latitude=-13.8&longitude=-171.7")),
+            ["Viewed_3", "Viewed_2"])
+
+    def test_invalid(self):
+        """Test missing, malformed or out of bounds parameters"""
+        for url in ("/places_near?latitude=48&longitude=2",
+                    "/places_near?latitude=91&longitude=2&radius=1",
+                    "/places_near?latitude=48&longitude=east&radius=1",
+                    "/places_near?latitude=48&longitude=2&radius=-1",
+                    "/places_near?latitude=48&longitude=2&radius=1&limit=0",
+                    "/places_within?south=10&west=0&north=0&east=10",
+                    "/places_within?south=0&west=0&north=10"):
+            response = self.client.get("/api/v1" + url)
+            self.assertEqual(response.status_code, 400, url)
@@ -0,0 +1,114 @@
+#!/usr/bin/python3
+"""
+Contains the TestSearchDocs and TestSearch classes
+"""
+
+from api.v1.app import app
+from api.v1.views import search
+import models
+from models.city import City
+from models.place import Place
+from models.review import Review
+from models.state import State
+from models.user import User
+import os
+import pep8
+import unittest
+
+
+class TestSearchDocs(unittest.TestCase):
+    """Tests to check the documentation and style of the search view"""
+
+    def test_pep8_conformance_search(self):
+        """Test that api/v1/views/search.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['api/v1/views/search.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_search(self):
+        """Test tests/test_api/test_v1/test_views/test_search.py conforms to
+        PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_api/test_v1/test_views/\
+test_search.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_search_module_docstring(self):
+        """Test for the search.py module docstring"""
+        self.assertIsNot(search.__doc__, None,
+                         "search.py needs a docstring")
+        self.assertTrue(len(search.__doc__) >= 1,
+                        "search.py needs a docstring")
+
+
+class TestSearch(unittest.TestCase):
+    """Test GET /api/v1/search"""
+
+    texts = ("Quiet loft by the Qwzriver",
+             "qwzriver view, qwzriver walks and a qwzgarden",
+             "qwzgarden shed")
+
+    def setUp(self):
+        """Create places described by texts, a review and a test client"""
+        self.client = app.test_client()
+        self.user = User(email="searched@mail.com", password="pwd")
+        self.state = State(name="Searched")
+        self.city = City(name="Searched", state_id=self.state.id)
+        self.places = [Place(name="Searched_{}".format(i),
+                             city_id=self.city.id, user_id=self.user.id,
+                             description=text)
+                       for i, text in enumerate(self.texts)]
+        self.review = Review(place_id=self.places[0].id, user_id=self.user.id,
+                             text="A qwzriver to remember")
+        for obj in [self.user, self.state, self.city] + self.places + \
+                [self.review]:
+            obj.save()
+        models.storage.close()
+
+    def tearDown(self):
+        """Delete the objects setUp created and the text indexes saved"""
+        for obj in [self.review] + self.places + \
+                [self.city, self.state, self.user]:
+            models.storage.delete(models.storage.get(type(obj), obj.id))
+        models.storage.save()
+        for name in ("Place", "Review"):
+            path = "file.json.{}.idx".format(name)
+            if os.path.exists(path):
+                os.remove(path)
+
+    def names(self, url):
+        """Returns the names of the places url finds and its response"""
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return [place["name"] for place in response.get_json()], response
+
+    def test_rank(self):
+        """Test places are ranked by BM25, and reviews searched by type"""
+        self.assertEqual(self.names("/api/v1/search?q=QWZRIVER")[0],
+                         ["Searched_1", "Searched_0"])
+        self.assertEqual(self.names("/api/v1/search?q=qwznothing")[0], [])
+        response = self.client.get("/api/v1/search?q=qwzriver&type=reviews")
+        self.assertEqual([review["id"] for review in response.get_json()],
+                         [self.review.id])
+
+    def test_pages(self):
+        """Test following the next cursor pages through the ranking"""
+        url = "/api/v1/search?q=qwzriver+qwzgarden&limit=2"
+        names, response = self.names(url)
+        self.assertEqual(len(names), 2)
+        self.assertEqual(response.headers["X-Next-Cursor"], "2")
+        link = response.headers["Link"]
+        self.assertIn("cursor=2", link)
+        more, response = self.names(link[1:link.index(">")])
+        self.assertNotIn("X-Next-Cursor", response.headers)
+        self.assertEqual(sorted(names + more),
+                         ["Searched_0", "Searched_1", "Searched_2"])
+
+    def test_invalid(self):
+        """Test missing or malformed parameters"""
+        for query in ("", "?type=places", "?q=a&type=users", "?q=a&limit=0",
+                      "?q=a&cursor=-1", "?q=a&cursor=next"):
+            response = self.client.get("/api/v1/search" + query)
+            self.assertEqual(response.status_code, 400, query)
@@ -2,8 +2,12 @@
 """Test BaseModel for expected behavior and documentation"""
 from datetime import datetime
 import inspect
+import json
 import models
+import os
 import pep8 as pycodestyle
+import subprocess
+import sys
 import time
 import unittest
 from unittest import mock
@@ -138,6 +142,58 @@ class TestBaseModel(unittest.TestCase):
         self.assertEqual(new_d["created_at"], bm.created_at.strftime(t_format))
         self.assertEqual(new_d["updated_at"], bm.updated_at.strftime(t_format))
 
+    def test_time_codec(self):
+        """test that parse_time and format_time match strptime/strftime"""
+        t_format = "%Y-%m-%dT%H:%M:%S.%f"
+        for value in [datetime(2017, 9, 28, 21, 5, 54, 119427),
+                      datetime(2017, 9, 28, 21, 5, 54)]:
+            with self.subTest(value=value):
+                string = models.base_model.format_time(value)
+                self.assertEqual(string, value.strftime(t_format))
+                self.assertEqual(models.base_model.parse_time(string), value)
+        self.assertEqual(models.base_model.parse_time("2017-09-28T21:05:54.1"),
+                         datetime(2017, 9, 28, 21, 5, 54, 100000))
+
+    @unittest.skipIf(models.storage_t == "db", "not testing file storage")
+    def test_compact_models(self):
+        """test that HBNB_COMPACT_MODELS keeps the model contract with
+        smaller instances, measuring the bytes per instance of each class"""
+        benchmark = """if True:
+            import json, tracemalloc
+            from models.engine.file_storage import classes
+            sizes = {}
+            fields = {"Amenity": "name", "City": "name", "Place": "name",
+                      "Review": "text", "State": "name", "User": "email"}
+            for name, field in fields.items():
+                records = [classes[name](**{field: "x"}).to_dict()
+                           for i in range(500)]
+                tracemalloc.start()
+                objs = [classes[name](**record) for record in records]
+                for obj in objs:
+                    obj.to_dict()
+                sizes[name] = tracemalloc.get_traced_memory()[0] // 500
+                tracemalloc.stop()
+            place = classes["Place"](name="Flat", extra=1)
+            place.name = "Loft"
+            print(json.dumps([sizes, place.to_dict()["extra"],
+                              place.number_rooms, place.name,
+                              str(place).startswith("[Place] (")]))
+        """
+        results = []
+        for flag in ("0", "1"):
+            env = dict(os.environ, HBNB_COMPACT_MODELS=flag)
+            output = subprocess.run([sys.executable, "-c", benchmark],
+                                    env=env, stdout=subprocess.PIPE,
+                                    check=True).stdout
+            results.append(json.loads(output))
+        (sizes, *contract), (compact_sizes, *compact_contract) = results
+        self.assertEqual(compact_contract, [1, 0, "Loft", True])
+        self.assertEqual(compact_contract, contract)
+        for name, size in sizes.items():
+            with self.subTest(cls=name, size=size,
+                              compact_size=compact_sizes[name]):
+                self.assertLess(compact_sizes[name], size)
+
     def test_str(self):
         """test that the str method has the correct output"""
         inst = BaseModel()
@@ -4,6 +4,7 @@ Contains the TestDBStorageDocs and TestDBStorage classes
 """
 
 from datetime import datetime
+import importlib
 import inspect
 import models
 from models.engine import db_storage
@@ -17,7 +18,11 @@ from models.user import User
 import json
 import os
 import pep8
+from sqlalchemy import create_engine, event
+import threading
+import time
 import unittest
+from unittest import mock
 DBStorage = db_storage.DBStorage
 classes = {"Amenity": Amenity, "City": City, "Place": Place,
            "Review": Review, "State": State, "User": User}
@@ -68,6 +73,45 @@ test_db_storage.py'])
                             "{:s} method needs a docstring".format(func[0]))
 
 
+class TestEngineOptions(unittest.TestCase):
+    """Test the engine and pool configuration of DBStorage"""
+    def test_engine_options(self):
+        """Test the HBNB_MYSQL_* pool settings become engine options"""
+        env = {"HBNB_MYSQL_POOL_SIZE": "8", "HBNB_MYSQL_MAX_OVERFLOW": "0",
+               "HBNB_MYSQL_POOL_PRE_PING": "true",
+               "HBNB_MYSQL_POOL_RECYCLE": "",
+               "HBNB_MYSQL_ISOLATION_LEVEL": "READ COMMITTED"}
+        with mock.patch.dict(os.environ, env):
+            self.assertEqual(db_storage.engine_options(),
+                             {"pool_size": 8, "max_overflow": 0,
+                              "pool_pre_ping": True,
+                              "isolation_level": "READ COMMITTED"})
+
+    def test_pool_stats(self):
+        """Test the pool counts checkouts and waits under contention"""
+        engine = create_engine("sqlite://",
+                               poolclass=db_storage.TimedQueuePool,
+                               connect_args={"check_same_thread": False},
+                               pool_size=2, max_overflow=0)
+
+        def request():
+            with engine.connect() as conn:
+                conn.exec_driver_sql("SELECT 1")
+                time.sleep(0.05)
+        threads = [threading.Thread(target=request) for i in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = engine.pool.stats()
+        self.assertEqual(stats["size"], 2)
+        self.assertEqual(stats["checked_out"], 0)
+        self.assertEqual(stats["checked_in"], 2)
+        self.assertEqual(stats["checkouts"], 6)
+        self.assertGreater(stats["max_wait"], 0.04)
+        self.assertGreaterEqual(stats["wait_time"], stats["max_wait"])
+
+
 class TestFileStorage(unittest.TestCase):
     """Test the FileStorage class"""
     @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
@@ -108,3 +152,156 @@ class TestFileStorage(unittest.TestCase):
         state_objects = models.storage.count(State)
         self.assertEqual(all_objects, len(models.storage.all()))
         self.assertEqual(state_objects, len(models.storage.all(State)))
+
+    @unittest.skipIf(models.storage_t != "db", "not testing db storage")
+    def test_bulk_new_and_update(self):
+        """Test bulk_new and bulk_update write many rows per statement"""
+        states = [State(name="Bulk_{}".format(i)) for i in range(50)]
+        self.assertLessEqual(self.queries(
+            lambda: models.storage.bulk_new(states)), 3)
+        self.assertIsNotNone(models.storage.get(State, states[-1].id))
+        self.assertLessEqual(self.queries(lambda: models.storage.bulk_update(
+            State, [{"id": state.id, "name": "Bulked"}
+                    for state in states])), 3)
+        self.assertEqual(models.storage.count(State, name="Bulked"), 50)
+        self.assertEqual(models.storage.get(State, states[0].id).name,
+                         "Bulked")
+
+    @unittest.skipIf(models.storage_t != "db", "not testing db storage")
+    def test_search(self):
+        """Test search filters and sorts on numeric ranges in SQL"""
+        user = User(email="ranged@mail.com", password="pwd")
+        city = City(name="Ranged_city", state_id=self.state_1.id)
+        places = [Place(name="Ranged", city_id=city.id, user_id=user.id,
+                        price_by_night=100000 + i, number_rooms=i % 3)
+                  for i in range(10)]
+        models.storage.bulk_new([user, city] + places)
+        found = models.storage.search(Place, order_by="-price_by_night",
+                                      limit=2, number_rooms=(1, None),
+                                      price_by_night=(100000, None))
+        self.assertEqual([place.price_by_night for place in found],
+                         [100008, 100007])
+
+    @unittest.skipIf(models.storage_t != "db", "not testing db storage")
+    def test_ids(self):
+        """Test ids reads a posting list in one query"""
+        user = User(email="posted@mail.com", password="pwd")
+        city = City(name="Posted", state_id=self.state_1.id)
+        place = Place(name="Posted", city_id=city.id, user_id=user.id)
+        place.amenities.append(Amenity(name="Posted"))
+        for obj in (user, city, place):
+            obj.save()
+        self.assertEqual(self.queries(lambda: self.assertEqual(
+            models.storage.ids(City, "state_id", [self.state_1.id]),
+            {city.id})), 1)
+        self.assertEqual(models.storage.ids(
+            Place, "amenity_ids", [place.amenities[0].id]), {place.id})
+
+    @unittest.skipIf(models.storage_t != "db", "not testing db storage")
+    def test_near_and_within(self):
+        """Test the geographic queries bound their rows in SQL"""
+        user = User(email="located@mail.com", password="pwd")
+        city = City(name="Located", state_id=self.state_1.id)
+        points = {"Suva": (-18.1248, 178.4501), "Apia": (-13.8333, -171.7667),
+                  "Paris": (48.8566, 2.3522)}
+        places = [Place(name=name, city_id=city.id, user_id=user.id,
+                        latitude=latitude, longitude=longitude)
+                  for name, (latitude, longitude) in points.items()]
+        models.storage.bulk_new([user, city] + places)
+        self.assertEqual([place.name for place in models.storage.within(
+            Place, -20, 170, -10, -170)], ["Suva", "Apia"])
+        self.assertEqual([place.name for place in models.storage.near(
+            Place, -18, 178, 1000)], ["Suva"])
+
+    @unittest.skipIf(models.storage_t != "db", "not testing db storage")
+    def test_text_search(self):
+        """Test text_search ranks the rows LIKE finds with BM25"""
+        user = User(email="texted@mail.com", password="pwd")
+        city = City(name="Texted", state_id=self.state_1.id)
+        places = [Place(name="Texted", city_id=city.id, user_id=user.id,
+                        description=text) for text in (
+            "Quiet loft by the Qwzriver",
+            "qwzriver view, qwzriver walks and a qwzgarden",
+            "qwzgarden shed", "qwzriverside")]
+        models.storage.bulk_new([user, city] + places)
+
+        ids = [place.id for place in places]
+
+        def search(query, **kwargs):
+            return [ids.index(place.id) for place in
+                    models.storage.text_search(Place, query, **kwargs)]
+        self.assertEqual(search("QWZRIVER"), [1, 0])
+        self.assertEqual(search("qwzriver qwzgarden", limit=1, offset=1), [2])
+        self.assertEqual(search("qwznothing"), [])
+
+    def queries(self, func):
+        """Returns how many SQL statements running func takes"""
+        statements = []
+        engine = models.storage._DBStorage__engine
+
+        def listener(conn, cursor, statement, *args):
+            statements.append(statement)
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            func()
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+        return len(statements)
+
+    @unittest.skipIf(models.storage_t != "db", "not testing db storage")
+    def test_filter_eager_loading(self):
+        """Test filter fetches the relationships in load with the objects"""
+        for state in (self.state_1, self.state_2):
+            user = User(email="eager@mail.com", password="pwd")
+            user.save()
+            for name in ("Eager_city_1", "Eager_city_2"):
+                city = City(name=name, state_id=state.id)
+                city.save()
+                place = Place(name="Eager_place", city_id=city.id,
+                              user_id=user.id)
+                place.amenities.append(Amenity(name="Eager_amenity"))
+                place.save()
+                Review(text="Eager", place_id=place.id,
+                       user_id=user.id).save()
+        cases = [(State, ("cities",), lambda s: s.cities, 2),
+                 (Place, ("reviews",), lambda p: p.reviews, 2),
+                 (Place, {"amenities": "joined"}, lambda p: p.amenities, 1),
+                 (User, ("places",), lambda u: u.places, 2),
+                 (State, ("cities.places",),
+                  lambda s: [c.places for c in s.cities], 3)]
+        for cls, load, related, queries in cases:
+            with self.subTest(cls=cls.__name__, load=load):
+                models.storage.close()
+                lazy = self.queries(lambda: [
+                    related(obj) for obj in models.storage.filter(cls)])
+                models.storage.close()
+                eager = self.queries(lambda: [
+                    related(obj) for obj in models.storage.filter(
+                        cls, load=load)])
+                self.assertEqual(eager, queries)
+                self.assertGreater(lazy, eager)
+
+    @unittest.skipIf(models.storage_t != "db", "not testing db storage")
+    def test_pages_eager_loading(self):
+        """Test the pages listing the states and their cities take as many
+        queries however many states there are"""
+        for module, url in (("8-cities_by_states", "/cities_by_states"),
+                            ("10-hbnb_filters", "/hbnb_filters")):
+            with self.subTest(url=url):
+                app = importlib.import_module("web_flask." + module).app
+                client = app.test_client()
+                counts = []
+                for i in range(2):
+                    for j in range(4):
+                        state = State(name="Rendered_state")
+                        state.save()
+                        for k in range(2):
+                            City(name="Rendered_city",
+                                 state_id=state.id).save()
+                    models.storage.close()
+                    responses = []
+                    counts.append(self.queries(
+                        lambda: responses.append(client.get(url))))
+                    self.assertEqual(responses[0].status_code, 200)
+                    self.assertIn(b"Rendered_city", responses[0].data)
+                self.assertEqual(counts[1], counts[0])
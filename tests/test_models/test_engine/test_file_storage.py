@@ -17,7 +17,9 @@ from models.user import User
 import json
 import os
 import pep8
+import threading
 import unittest
+from unittest import mock
 FileStorage = file_storage.FileStorage
 classes = {"Amenity": Amenity, "BaseModel": BaseModel, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
@@ -122,6 +124,15 @@ class TestFileStorage(unittest.TestCase):
         self.state_2 = State(name="Fake_state_2")
         self.state_2.save()
 
+    def tearDown(self):
+        """Fold the journal back into file.json and remove the text indexes
+        the tests saved"""
+        models.storage.compact()
+        for name in classes:
+            path = "file.json.{}.idx".format(name)
+            if os.path.exists(path):
+                os.remove(path)
+
     @unittest.skipIf(models.storage_t == "db", "not testing file storage")
     def test_get(self):
         """Test get method"""
@@ -135,3 +146,493 @@ class TestFileStorage(unittest.TestCase):
         state_objects = models.storage.count(State)
         self.assertEqual(all_objects, len(models.storage.all()))
         self.assertEqual(state_objects, len(models.storage.all(State)))
+
+    @unittest.skipIf(models.storage_t == "db", "not testing file storage")
+    def test_get_missing(self):
+        """Test get returns None for unknown ids and classes"""
+        self.assertIsNone(models.storage.get(State, "no-such-id"))
+        self.assertIsNone(models.storage.get(City, self.state_1.id))
+        self.assertIsNone(models.storage.get("State", self.state_1.id))
+
+    @unittest.skipIf(models.storage_t == "db", "not testing file storage")
+    def test_all_cls_tracks_new_and_delete(self):
+        """Test all(cls) only returns objects of cls, kept up to date"""
+        city = City(name="Fake_city")
+        models.storage.new(city)
+        states = models.storage.all(State)
+        self.assertIn("State." + self.state_1.id, states)
+        self.assertNotIn("City." + city.id, states)
+        self.assertEqual(states, models.storage.all("State"))
+        self.assertIn("City." + city.id, models.storage.all(City))
+        models.storage.delete(city)
+        self.assertNotIn("City." + city.id, models.storage.all(City))
+
+    @unittest.skipIf(models.storage_t == "db", "not testing file storage")
+    def test_all_by_foreign_key(self):
+        """Test all_by follows new, attribute updates and delete"""
+        city = City(name="Fake_city", state_id=self.state_1.id)
+        models.storage.new(city)
+        key = "City." + city.id
+        self.assertIn(key, models.storage.all_by(City, "state_id",
+                                                 self.state_1.id))
+        self.assertIn(city, self.state_1.cities)
+        city.state_id = self.state_2.id
+        self.assertNotIn(city, self.state_1.cities)
+        self.assertIn(city, self.state_2.cities)
+        models.storage.delete(city)
+        self.assertNotIn(city, self.state_2.cities)
+
+    @unittest.skipIf(models.storage_t == "db", "not testing file storage")
+    def test_ids(self):
+        """Test ids gathers the posting lists of several values"""
+        cities = [City(name="Posted", state_id=state.id)
+                  for state in (self.state_1, self.state_2)]
+        place = Place(name="Posted", city_id=cities[0].id,
+                      amenity_ids=["wifi", "tv"])
+        models.storage.bulk_new(cities + [place])
+        self.assertEqual(models.storage.ids(City, "state_id",
+                                            [self.state_1.id,
+                                             self.state_2.id]),
+                         {city.id for city in cities})
+        self.assertEqual(models.storage.ids(Place, "amenity_ids", ["tv"]),
+                         {place.id})
+        self.assertEqual(models.storage.ids(Place, "city_id", []), set())
+        for obj in cities + [place]:
+            models.storage.delete(obj)
+
+    @unittest.skipIf(models.storage_t == "db", "not testing file storage")
+    def test_save_journals_changes(self):
+        """Test save appends to the journal and reload replays it"""
+        storage = FileStorage()
+        storage.compact()
+        state = State(name="Journaled")
+        state.save()
+        key = "State." + state.id
+        with open("file.json", "r") as f:
+            self.assertNotIn(key, json.load(f))
+        with open("file.json.log", "r") as f:
+            self.assertEqual(json.loads(f.readlines()[-1])[0], key)
+        save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        storage.reload()
+        self.assertEqual(storage.all()[key].to_dict(), state.to_dict())
+        storage.delete(state)
+        storage.save()
+        FileStorage._FileStorage__objects = {}
+        storage.reload()
+        self.assertNotIn(key, storage.all())
+        FileStorage._FileStorage__objects = save
+        storage.delete(state)
+
+    @unittest.skipIf(models.storage_t == "db", "not testing file storage")
+    def test_bulk_new_and_update(self):
+        """Test bulk_new and bulk_update save many objects in one append"""
+        storage = FileStorage()
+        storage.compact()
+        states = [State(name="Bulk_{}".format(i)) for i in range(50)]
+        storage.bulk_new(states)
+        with open("file.json.log", "r") as f:
+            lines = f.readlines()
+        self.assertEqual(len(lines), 50)
+        storage.bulk_update(State, [{"id": states[0].id, "name": "Bulked"},
+                                    {"id": "missing", "name": "Nope"}])
+        with open("file.json.log", "r") as f:
+            self.assertEqual(len(f.readlines()), 51)
+        self.assertEqual(storage.get(State, states[0].id).name, "Bulked")
+        self.assertGreater(states[0].updated_at, states[0].created_at)
+        self.assertIsNone(storage.get(State, "missing"))
+        for state in states:
+            storage.delete(state)
+
+    @unittest.skipIf(models.storage_t == "db", "not testing file storage")
+    def test_bulk_new_invalid_id(self):
+        """Test bulk_new adds nothing if one of the objects has no string
+        id"""
+        storage = FileStorage()
+        storage.compact()
+        count = storage.count(State)
+        first = State(name="Bulk_first")
+        with self.assertRaises(TypeError):
+            storage.bulk_new([first, State(id=5, name="Bulk_bad")])
+        self.assertEqual(storage.count(State), count)
+        self.assertIsNone(storage.get(State, first.id))
+        storage.save()
+        self.assertFalse(os.path.exists("file.json.log"))
+
+    @unittest.skipIf(models.storage_t == "db", "not testing file storage")
+    def test_save_journals_dirty_objects(self):
+        """Test setting an attribute marks a stored object dirty"""
+        storage = FileStorage()
+        storage.compact()
+        self.state_1.name = "Renamed"
+        storage.save()
+        with open("file.json.log", "r") as f:
+            key, value = json.loads(f.readlines()[-1])
+        self.assertEqual(key, "State." + self.state_1.id)
+        self.assertEqual(value, self.state_1.to_dict())
+        storage.compact()
+        with open("file.json", "r") as f:
+            js = json.load(f)
+        self.assertEqual(js[key], self.state_1.to_dict())
+        self.assertEqual(len(js), len(storage.all()))
+
+    @unittest.skipIf(models.storage_t == "db", "not testing file storage")
+    def test_reload_streams_and_defers(self):
+        """Test reload reads file.json in chunks and instantiates lazily"""
+        storage = FileStorage()
+        storage.compact()
+        with open("file.json", "r") as f:
+            js = json.load(f)
+        save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__chunk_size = 7
+        try:
+            storage.reload()
+        finally:
+            FileStorage._FileStorage__chunk_size = 1 << 20
+        self.assertEqual(storage.count(), len(js))
+        self.assertEqual(storage.count(State),
+                         len([k for k in js if k.startswith("State.")]))
+        self.assertEqual(FileStorage._FileStorage__objects, {})
+        state = storage.get(State, self.state_1.id)
+        self.assertEqual(list(FileStorage._FileStorage__objects),
+                         ["State." + self.state_1.id])
+        self.assertEqual(state.to_dict(), self.state_1.to_dict())
+        all_dicts = {k: v.to_dict() for k, v in storage.all().items()}
+        self.assertEqual(all_dicts, js)
+        FileStorage._FileStorage__objects = save
+
+    @unittest.skipIf(models.storage_t == "db", "not testing file storage")
+    def test_search(self):
+        """Test search ranges over Place columns kept in sync with storage"""
+        storage = FileStorage()
+        places = [Place(name="Ranged", price_by_night=100000 + i,
+                        number_rooms=i % 3) for i in range(10)]
+        storage.bulk_new(places)
+        prices = (100000, 100100)
+
+        def search(**kwargs):
+            return [place.price_by_night - 100000 for place in
+                    storage.search(Place, price_by_night=prices, **kwargs)]
+        self.assertEqual(search(order_by="price_by_night"), list(range(10)))
+        self.assertEqual(search(order_by="-price_by_night", limit=2), [9, 8])
+        self.assertEqual(search(number_rooms=(2, None),
+                                order_by="price_by_night"), [2, 5, 8])
+        places[5].number_rooms = 0
+        places[4].price_by_night = "free"
+        storage.delete(places[8])
+        self.assertEqual(search(number_rooms=(2, 2)), [2])
+        self.assertNotIn(4, search())
+        storage.save()
+        storage.compact()
+        save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        storage.reload()
+        self.assertEqual(search(order_by="-number_rooms", limit=1), [2])
+        self.assertEqual(len(FileStorage._FileStorage__objects), 1)
+        FileStorage._FileStorage__objects = save
+        for place in places:
+            storage.delete(place)
+
+    @unittest.skipIf(models.storage_t == "db", "not testing file storage")
+    def test_search_builds_columns_unlocked(self):
+        """Test the columns are built without holding the storage lock,
+        picking up the changes made meanwhile"""
+        storage = FileStorage()
+        storage.reload()
+        place = Place(name="Unlocked", price_by_night=200000)
+        added = Place(name="Unlocked", price_by_night=200001)
+        storage.new(place)
+        build = FileStorage._FileStorage__make_columns
+
+        def make_columns(instance, *args):
+            def change():
+                storage.new(added)
+                place.price_by_night = 200002
+            thread = threading.Thread(target=change)
+            thread.start()
+            thread.join(5)
+            self.assertFalse(thread.is_alive())
+            return build(instance, *args)
+        with mock.patch.object(FileStorage, "_FileStorage__make_columns",
+                               make_columns):
+            found = storage.search(Place, "price_by_night",
+                                   price_by_night=(200000, None))
+        self.assertEqual(found, [added, place])
+        storage.delete(place)
+        storage.delete(added)
+
+    @unittest.skipIf(models.storage_t == "db", "not testing file storage")
+    def test_near_and_within(self):
+        """Test the geographic queries follow places as they move"""
+        storage = FileStorage()
+        points = {"Paris": (48.8566, 2.3522), "Versailles": (48.8049, 2.1204),
+                  "London": (51.5074, -0.1278), "Suva": (-18.1248, 178.4501),
+                  "Apia": (-13.8333, -171.7667), "Nowhere": (None, 0.0)}
+        places = {name: Place(name=name, latitude=latitude,
+                              longitude=longitude)
+                  for name, (latitude, longitude) in points.items()}
+        storage.bulk_new(list(places.values()))
+
+        def names(objs):
+            return [obj.name for obj in objs if obj in places.values()]
+        self.assertEqual(names(storage.near(Place, 48.86, 2.34, 30)),
+                         ["Paris", "Versailles"])
+        self.assertEqual(names(storage.near(Place, 48.8, 2.1, 400,
+                                            limit=1)), ["Versailles"])
+        self.assertEqual(names(storage.within(Place, -20, 170, -10, -170)),
+                         ["Suva", "Apia"])
+        self.assertEqual(names(storage.within(Place, 40, -10, 60, 10,
+                                              51.5, 0.0)),
+                         ["London", "Versailles", "Paris"])
+        places["London"].latitude = 48.86
+        places["London"].longitude = 2.35
+        places["Paris"].longitude = "east"
+        self.assertEqual(names(storage.near(Place, 48.86, 2.34, 30)),
+                         ["London", "Versailles"])
+        for place in places.values():
+            storage.delete(place)
+        self.assertEqual(names(storage.near(Place, 48.86, 2.34, 30)), [])
+
+    @unittest.skipIf(models.storage_t == "db", "not testing file storage")
+    def test_text_search(self):
+        """Test text_search ranks with BM25, follows changes and is loaded
+        back from the saved index on restart"""
+        storage = FileStorage()
+        places = [Place(name="Texted", description=text) for text in (
+            "Quiet loft by the Qwzriver",
+            "qwzriver view, qwzriver walks and a qwzgarden",
+            "qwzgarden shed")]
+        storage.bulk_new(places)
+
+        def search(query, **kwargs):
+            return [places.index(place) for place in
+                    storage.text_search(Place, query, **kwargs)]
+        self.assertEqual(search("QWZRIVER"), [1, 0])
+        self.assertEqual(search("qwzriver, qwzgarden"), [1, 2, 0])
+        self.assertEqual(search("qwzriver qwzgarden", limit=1, offset=1), [2])
+        self.assertEqual(search("qwznothing"), [])
+        places[2].description = "qwzriver cabin"
+        storage.delete(places[0])
+        self.assertEqual(search("qwzgarden"), [1])
+        self.assertCountEqual(search("qwzriver"), [1, 2])
+        storage.save()
+        storage.compact()
+        with open("file.json.Place.idx", "r") as f:
+            self.assertEqual(json.load(f)["snapshot"][1],
+                             os.path.getsize("file.json"))
+        places[1].description = "qwzmoved"
+        storage.save()
+        save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        storage.reload()
+        self.assertIn("Place", FileStorage._FileStorage__texts)
+        self.assertEqual([place.description for place in
+                          storage.text_search(Place, "qwzriver")],
+                         ["qwzriver cabin"])
+        self.assertEqual(len(FileStorage._FileStorage__objects), 1)
+        self.assertEqual(len(storage.text_search(Place, "qwzmoved")), 1)
+        FileStorage._FileStorage__objects = save
+        storage.reload()
+        for place in places:
+            storage.delete(storage.get(Place, place.id))
+        storage.save()
+        self.assertEqual(storage.text_search(Place, "qwzmoved"), [])
+
+    @unittest.skipIf(models.storage_t == "db", "not testing file storage")
+    def test_text_search_builds_unlocked(self):
+        """Test the text index is built without holding the storage lock,
+        picking up the changes made meanwhile"""
+        storage = FileStorage()
+        if os.path.exists("file.json.Place.idx"):
+            os.remove("file.json.Place.idx")
+        storage.reload()
+        place = Place(name="Unlocked", description="qwzlocked")
+        added = Place(name="Unlocked", description="qwzunlocked")
+        storage.new(place)
+        build = FileStorage._FileStorage__make_text
+
+        def make_text(instance, *args):
+            def change():
+                storage.new(added)
+                place.description = "qwzunlocked qwzunlocked"
+            thread = threading.Thread(target=change)
+            thread.start()
+            thread.join(5)
+            self.assertFalse(thread.is_alive())
+            return build(instance, *args)
+        with mock.patch.object(FileStorage, "_FileStorage__make_text",
+                               make_text):
+            found = storage.text_search(Place, "qwzunlocked qwzlocked")
+        self.assertEqual(found, [place, added])
+        storage.delete(place)
+        storage.delete(added)
+        self.assertEqual(storage.text_search(Place, "qwzunlocked"), [])
+
+    @unittest.skipIf(models.storage_t == "db", "not testing file storage")
+    def test_concurrent_saves(self):
+        """Test saves from concurrent threads are all made durable"""
+        storage = FileStorage()
+        created = []
+
+        def create():
+            """create and save a few states"""
+            for i in range(20):
+                state = State(name="Concurrent")
+                state.save()
+                created.append("State." + state.id)
+
+        threads = [threading.Thread(target=create) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        storage.reload()
+        stored = storage.all(State)
+        FileStorage._FileStorage__objects = save
+        self.assertEqual(len(created), 160)
+        for key in created:
+            self.assertIn(key, stored)
+            storage.delete(save[key])
+
+    @unittest.skipIf(models.storage_t == "db", "not testing file storage")
+    def test_fsync_policies(self):
+        """Test the fsync policy decides when saves reach the disk"""
+        storage = FileStorage()
+        with mock.patch("models.engine.file_storage.os.fsync") as fsync:
+            storage.compact()
+            self.state_1.save()
+            self.assertFalse(fsync.called)
+            FileStorage._FileStorage__fsync = "save"
+            try:
+                self.state_1.save()
+                self.assertEqual(fsync.call_count, 1)
+                storage.compact()
+                self.assertEqual(fsync.call_count, 3)
+            finally:
+                FileStorage._FileStorage__fsync = "none"
+        self.assertFalse(os.path.exists("file.json.tmp"))
+        self.assertFalse(os.path.exists("file.json.log"))
+
+    def test_fsync_policy(self):
+        """Test HBNB_FSYNC values are parsed once, invalid ones refused"""
+        self.assertEqual(file_storage.fsync_policy("none"), "none")
+        self.assertEqual(file_storage.fsync_policy(" Save "), "save")
+        self.assertEqual(file_storage.fsync_policy("250"), 250.0)
+        for value in ("always", "-1", "nan", "inf", ""):
+            with self.assertRaises(ValueError):
+                file_storage.fsync_policy(value)
+
+    @unittest.skipIf(models.storage_t == "db", "not testing file storage")
+    def test_close_reloads_only_external_changes(self):
+        """Test close keeps objects unless the files changed elsewhere"""
+        storage = FileStorage()
+        storage.compact()
+        self.state_1.save()
+        storage.close()
+        self.assertIs(storage.get(State, self.state_1.id), self.state_1)
+        other = State(name="Written_elsewhere")
+        with open("file.json.log", "a") as f:
+            f.write(json.dumps(["State." + other.id, other.to_dict()]) + "\n")
+        storage.close()
+        self.assertIs(storage.get(State, self.state_1.id), self.state_1)
+        self.assertEqual(storage.get(State, other.id).to_dict(),
+                         other.to_dict())
+        storage.delete(storage.get(State, other.id))
+        storage.compact()
+        with open("file.json", "r") as f:
+            js = json.load(f)
+        js["State." + self.state_1.id]["name"] = "Renamed_elsewhere"
+        with open("file.json", "w") as f:
+            json.dump(js, f)
+        storage.close()
+        self.assertEqual(storage.get(State, self.state_1.id).name,
+                         "Renamed_elsewhere")
+
+    @unittest.skipIf(models.storage_t == "db", "not testing file storage")
+    def test_delete_reloaded_record(self):
+        """Test delete drops a record reloaded but not instantiated yet"""
+        storage = FileStorage()
+        state = State(name="Reloaded")
+        state.save()
+        storage.compact()
+        with open("file.json", "r") as f:
+            js = json.load(f)
+        js["State." + state.id]["name"] = "Renamed_elsewhere"
+        with open("file.json", "w") as f:
+            json.dump(js, f)
+        storage.close()
+        count = storage.count(State)
+        state.delete()
+        storage.save()
+        self.assertEqual(storage.count(State), count - 1)
+        storage.reload()
+        self.assertIsNone(storage.get(State, state.id))
+
+    @unittest.skipIf(models.storage_t == "db", "not testing file storage")
+    def test_filter(self):
+        """Test filter matches, orders, and pages through objects"""
+        storage = FileStorage()
+        ids = sorted(storage.all(State)[key].id for key in storage.all(State))
+        self.assertEqual([s.id for s in storage.filter(State, "id", 1)],
+                         ids[:1])
+        self.assertEqual([s.id for s in storage.filter(State, "id", 2,
+                                                       ids[0])], ids[1:3])
+        state = State(name="Paged")
+        storage.new(state)
+        self.assertIn(state, storage.filter(State, "id"))
+        self.assertEqual(storage.filter(State, name="Paged"), [state])
+        self.assertEqual(storage.count(State, name="Paged"), 1)
+        storage.delete(state)
+        self.assertNotIn(state, storage.filter(State, "id"))
+        self.assertEqual(storage.count(State, name="Paged"), 0)
+        names = [s.name for s in storage.filter(State, "name")]
+        self.assertEqual(names, sorted(names))
+        self.assertEqual(storage.filter(City, state_id=self.state_1.id), [])
+
+    @unittest.skipIf(models.storage_t == "db", "not testing file storage")
+    def test_iter(self):
+        """Test iter yields the same objects as all, one at a time"""
+        storage = FileStorage()
+        self.assertCountEqual(list(storage.iter(State)),
+                              storage.all(State).values())
+        city = City(name="Fake_city", state_id=self.state_1.id)
+        storage.new(city)
+        self.assertEqual(list(storage.iter(City, "state_id",
+                                           self.state_1.id)), [city])
+        storage.delete(city)
+
+    @unittest.skipIf(models.storage_t == "db", "not testing file storage")
+    def test_to_json_cache(self):
+        """Test to_json is cached and follows attribute changes"""
+        first = self.state_1.to_json()
+        self.assertEqual(json.loads(first), self.state_1.to_dict())
+        self.assertIs(self.state_1.to_json(), first)
+        self.state_1.name = "Renamed"
+        self.assertEqual(json.loads(self.state_1.to_json()),
+                         self.state_1.to_dict())
+        state = State(name="Not_stored")
+        self.assertEqual(json.loads(state.to_json()), state.to_dict())
+
+    @unittest.skipIf(models.storage_t == "db", "not testing file storage")
+    def test_to_json_reloaded_record(self):
+        """Test to_json of a reloaded record is the encoding of its
+        to_dict(), not the text it was stored as"""
+        storage = FileStorage()
+        storage.compact()
+        with open("file.json", "r") as f:
+            js = json.load(f)
+        js["State.written_elsewhere"] = {"id": "written_elsewhere",
+                                         "__class__": "State",
+                                         "name": "Written_elsewhere",
+                                         "created_at": "2017-09-28T21:05:54.1"}
+        with open("file.json", "w") as f:
+            json.dump(js, f)
+        storage.close()
+        state = storage.get(State, "written_elsewhere")
+        self.assertEqual(state.to_json(), json.dumps(state.to_dict()))
+        self.assertEqual(json.loads(state.to_json())["created_at"],
+                         "2017-09-28T21:05:54.100000")
+        storage.delete(state)